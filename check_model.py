@@ -1,6 +1,5 @@
-import pickle
+import joblib
+
+model = joblib.load('models\\model.pkl', mmap_mode='r')
 
-with open('models\\model.pkl', 'rb') as f:
-    model = pickle.load(f)
-    
 print(f"Model expects {model.n_features_in_} features")
\ No newline at end of file
@@ -237,6 +237,41 @@ function getComponentColor(contribution) {
     return '#17a2b8'; // Low contribution - blue
 }
 
+async function fetchExplanation(transaction, riskData) {
+    // /calculate-risk already started the explanation in the background - poll for it
+    if (riskData.explanation_id) {
+        for (let attempt = 0; attempt < 30; attempt++) {
+            await new Promise(resolve => setTimeout(resolve, 500));
+            const response = await fetch(`${API_URL}/explanation/${riskData.explanation_id}`);
+            if (response.status === 200) {
+                return response.json();
+            }
+            // 404 right after scoring: the audit row can still be queued on another worker
+            if (response.status !== 202 && !(response.status === 404 && attempt < 2)) {
+                break;
+            }
+        }
+    }
+    
+    // Fallback: generate it on demand
+    const response = await fetch(`${API_URL}/explain-decision`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            transaction: transaction,
+            risk_components: riskData.components,
+            decision: riskData.decision
+        })
+    });
+    
+    if (!response.ok) {
+        const errorData = await response.json();
+        throw new Error(errorData.error || `HTTP ${response.status}: ${response.statusText}`);
+    }
+    
+    return response.json();
+}
+
 async function generateExplanation(transaction, riskData) {
     const llmLoading = document.getElementById('llmLoading');
     const llmContent = document.getElementById('llmContent');
@@ -248,22 +283,7 @@ async function generateExplanation(transaction, riskData) {
     try {
         console.log('🤖 Requesting LLM explanation from Groq...');
         
-        const response = await fetch(`${API_URL}/explain-decision`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                transaction: transaction,
-                risk_components: riskData.components,
-                decision: riskData.decision
-            })
-        });
-        
-        if (!response.ok) {
-            const errorData = await response.json();
-            throw new Error(errorData.error || `HTTP ${response.status}: ${response.statusText}`);
-        }
-        
-        const data = await response.json();
+        const data = await fetchExplanation(transaction, riskData);
         
         // Hide loading, show explanation
         llmLoading.style.display = 'none';
@@ -1,23 +1,85 @@
 from flask import Flask
+from flask.json.provider import JSONProvider, DefaultJSONProvider
 from flask_cors import CORS
 from routes import api
-import traceback
-import sys
+from database import Session, init_db
+from config import Config, setup_logging
+import orjson
+import logging
+import os
 
-app = Flask(__name__)
-CORS(app)
+logger = logging.getLogger(__name__)
 
-# Register blueprint
-app.register_blueprint(api)
 
-# Add error handler to see full errors
-@app.errorhandler(500)
-def internal_error(error):
-    print("=" * 80, file=sys.stderr)
-    print("500 ERROR OCCURRED:", file=sys.stderr)
-    traceback.print_exc()
-    print("=" * 80, file=sys.stderr)
-    return {"error": "Internal server error", "details": str(error)}, 500
+class ORJSONProvider(JSONProvider):
+    """
+    jsonify()/request.json backed by orjson. Serializes numpy scalars/arrays and
+    datetimes natively (naive datetimes are treated as UTC and end in 'Z');
+    anything else falls back to Flask's default conversions.
+    """
+    OPTIONS = (
+        orjson.OPT_SERIALIZE_NUMPY
+        | orjson.OPT_NAIVE_UTC
+        | orjson.OPT_UTC_Z
+        | orjson.OPT_NON_STR_KEYS
+    )
+    
+    def dumps(self, obj, **kwargs):
+        return self.dumpb(obj).decode()
+    
+    def dumpb(self, obj):
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.OPTIONS)
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response - no str decode/re-encode per jsonify().
+        # Same argument handling as jsonify(): one value, several (a list) or kwargs (a dict)
+        if args and kwargs:
+            raise TypeError("app.json.response() takes either args or kwargs, not both")
+        if len(args) == 1:
+            obj = args[0]
+        else:
+            obj = args or kwargs or None
+        return self._app.response_class(self.dumpb(obj), mimetype='application/json')
 
+
+def create_app():
+    """Build the Flask app: config, CORS, blueprint, DB init and handlers"""
+    app = Flask(__name__)
+    app.json = ORJSONProvider(app)
+    
+    # Load config and logging once
+    Config.load()
+    setup_logging()
+    app.config['SECRET_KEY'] = Config.secret_key()
+    
+    CORS(app)
+    
+    # Create tables / indexes (no-op if already done in this process)
+    init_db()
+    
+    # Register blueprint
+    app.register_blueprint(api)
+    
+    # Return the request-scoped DB session to the pool once the request is done
+    @app.teardown_appcontext
+    def shutdown_session(exception=None):
+        Session.remove()
+    
+    # Log the full traceback for unhandled errors
+    @app.errorhandler(500)
+    def internal_error(error):
+        logger.exception("500 error: %s", error)
+        return {"error": "Internal server error", "details": str(error)}, 500
+    
+    return app
+
+
+# Module-level app for gunicorn (wsgi.py) and the dev runner
+app = create_app()
+
+# Dev server only - production runs under gunicorn (see wsgi.py)
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    app.run(debug=os.getenv('FLASK_ENV') == 'dev', port=5000)
\ No newline at end of file
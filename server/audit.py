@@ -3,13 +3,162 @@ Audit logging service for compliance tracking.
 Logs every risk decision with full context for regulatory requirements.
 """
 
-from database import SessionLocal, AuditLog
-import json
+from database import Session, AuditLog
+from background import LazyDaemonThread
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+from collections import deque
+import atexit
+import orjson
+import logging
+import threading
+import time
+import uuid
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Queued decisions are written in one INSERT + COMMIT at most this often
+AUDIT_FLUSH_INTERVAL_SECONDS = 0.2
+
+# Columns returned by get_audit_logs (plain rows, no ORM instances)
+AUDIT_LOG_COLUMNS = (
+    AuditLog.id,
+    AuditLog.audit_uuid,
+    AuditLog.transaction_id,
+    AuditLog.user_id,
+    AuditLog.risk_score,
+    AuditLog.decision,
+    AuditLog.risk_components,
+    AuditLog.explanation,
+    AuditLog.timestamp,
+)
+
+
+def _dump_components(risk_components):
+    """Serialize risk components to a JSON string (numpy scalars allowed), or None if empty"""
+    if not risk_components:
+        return None
+    return orjson.dumps(risk_components, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+class AuditWriter:
+    """
+    Buffers audit rows in memory and writes them in batches.
+    
+    Callers append a row and return immediately; a background worker drains the
+    buffer every AUDIT_FLUSH_INTERVAL_SECONDS with a single executemany INSERT
+    and one COMMIT. flush() drains synchronously for read-after-write callers.
+    
+    If a batch fails, its rows are retried one at a time so a single bad row
+    can't block the rest: rows that still fail are logged in full and dropped.
+    Only OperationalError (database locked / unavailable) re-queues rows.
+    """
+    
+    def __init__(self, interval=AUDIT_FLUSH_INTERVAL_SECONDS):
+        self._interval = interval
+        self._pending = deque()
+        # Held for the whole drain + commit, so flush() returns only once
+        # every row queued before it is committed (by whichever thread wrote it)
+        self._flush_lock = threading.Lock()
+        self._worker = LazyDaemonThread(self._run, name='audit-writer')
+    
+    def enqueue(self, row):
+        """Queue one audit row (dict of AuditLog column values)"""
+        self._worker.ensure_started()
+        self._pending.append(row)
+    
+    def flush(self):
+        """
+        Write every queued row in one transaction.
+        
+        Returns:
+            int: Number of rows written by this call
+        """
+        with self._flush_lock:
+            rows = []
+            while self._pending:
+                rows.append(self._pending.popleft())
+            if not rows:
+                return 0
+            
+            db = Session()
+            try:
+                db.execute(insert(AuditLog), rows)
+                db.commit()
+            except OperationalError:
+                db.rollback()
+                # Transient (locked/unavailable): put the rows back for the next flush
+                self._pending.extendleft(reversed(rows))
+                raise
+            except Exception as e:
+                db.rollback()
+                logger.warning("Audit batch of %d failed (%s) - retrying row by row", len(rows), e)
+                return self._write_rows(db, rows)
+            
+            logger.debug("Audit log flushed %d entries", len(rows))
+            return len(rows)
+    
+    def _write_rows(self, db, rows):
+        """Insert rows one per commit, dropping (and logging) the ones that fail"""
+        written = 0
+        for i, row in enumerate(rows):
+            try:
+                db.execute(insert(AuditLog), row)
+                db.commit()
+                written += 1
+            except OperationalError:
+                db.rollback()
+                self._pending.extendleft(reversed(rows[i:]))
+                raise
+            except Exception as e:
+                db.rollback()
+                # Logged in full so the entry can be recovered from the logs
+                logger.error("Dropping audit row that cannot be written (%s): %s",
+                             e, orjson.dumps(row, default=str).decode())
+        return written
+    
+    def _run(self):
+        while True:
+            time.sleep(self._interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Audit log flush error: %s", e)
+            finally:
+                # The worker thread owns its own scoped session
+                Session.remove()
+
+
+def flush_audit_log():
+    """
+    Commit all queued audit entries now (for reads that must see them).
+    
+    Never raises: if the database is unavailable the rows stay queued, the
+    error is logged and callers go on to read what is already committed.
+    
+    Returns:
+        int: Number of rows written by this call
+    """
+    try:
+        return audit_writer.flush()
+    except Exception as e:
+        logger.error("Audit log flush error: %s", e)
+        return 0
+
+
+# Process-wide audit writer; rows still queued at interpreter exit are written then
+audit_writer = AuditWriter()
+atexit.register(flush_audit_log)
+
+
 def log_decision(transaction_id, user_id, risk_score, decision, risk_components=None, explanation=None):
     """
-    Log a risk decision to the audit trail.
+    Queue a risk decision for the audit trail.
+    
+    The row is committed by the background audit writer within
+    AUDIT_FLUSH_INTERVAL_SECONDS; the returned audit_uuid identifies it
+    before that happens.
     
     Args:
         transaction_id (int): ID of the transaction being assessed
@@ -20,49 +169,38 @@ def log_decision(transaction_id, user_id, risk_score, decision, risk_components=
         explanation (str): LLM-generated explanation
     
     Returns:
-        AuditLog: The created audit log entry
+        str: audit_uuid of the queued entry
     
     Raises:
-        Exception: If database write fails
+        Exception: If the entry cannot be serialized
     """
-    print("=== AUDIT LOG START ===")
-    print(f"Logging decision for txn_id: {transaction_id}, user: {user_id}")
-    print(f"Risk score: {risk_score:.3f}, Decision: {decision}")
-    
-    # Create database session
-    db = SessionLocal()
+    logger.debug("Logging decision for txn_id: %s, user: %s, risk score: %.3f, decision: %s",
+                 transaction_id, user_id, risk_score, decision)
     
     try:
-        # Convert risk_components dict to JSON string for storage
-        components_json = json.dumps(risk_components) if risk_components else None
+        # Convert risk_components dict to JSON string for storage (column is TEXT)
+        components_json = _dump_components(risk_components)
         
-        # Create audit log entry
-        audit_entry = AuditLog(
-            transaction_id=transaction_id,
-            user_id=user_id,
-            risk_score=risk_score,
-            decision=decision,
-            risk_components=components_json,
-            explanation=explanation,
-            timestamp=datetime.utcnow()
-        )
+        # Assign the ID client-side so the response doesn't wait on COMMIT
+        audit_uuid = uuid.uuid4().hex
+        audit_writer.enqueue({
+            'audit_uuid': audit_uuid,
+            'transaction_id': transaction_id,
+            'user_id': user_id,
+            'risk_score': risk_score,
+            'decision': decision,
+            'risk_components': components_json,
+            'explanation': explanation,
+            'timestamp': datetime.utcnow()
+        })
         
-        # Persist to database
-        db.add(audit_entry)
-        db.commit()
-        db.refresh(audit_entry)  # Get the auto-generated ID
+        logger.debug("Audit log queued with ID: %s", audit_uuid)
         
-        print(f"✅ Audit log saved with ID: {audit_entry.id}")
-        print("=== AUDIT LOG SUCCESS ===")
-        
-        return audit_entry
+        return audit_uuid
         
     except Exception as e:
-        print(f"❌ AUDIT LOG ERROR: {str(e)}")
-        db.rollback()
+        logger.error("Audit log error: %s", e)
         raise Exception(f"Failed to log decision: {str(e)}")
-    finally:
-        db.close()
 
 
 def get_audit_logs(limit=10, user_id=None):
@@ -76,29 +214,40 @@ def get_audit_logs(limit=10, user_id=None):
     Returns:
         list: List of audit log dictionaries
     """
-    print(f"=== FETCHING AUDIT LOGS (limit={limit}, user_id={user_id}) ===")
-    
-    # Create database session
-    db = SessionLocal()
+    logger.debug("Fetching audit logs (limit=%s, user_id=%s)", limit, user_id)
     
     try:
-        # Build query
-        query = db.query(AuditLog)
+        # Include decisions still waiting in the audit writer's buffer (a failed
+        # flush is logged, not raised - committed entries are still returned)
+        flush_audit_log()
+        
+        # Core select of just the needed columns - skips ORM identity map/instrumentation
+        stmt = select(*AUDIT_LOG_COLUMNS)
         
         # Filter by user if specified
         if user_id:
-            query = query.filter(AuditLog.user_id == user_id)
+            stmt = stmt.where(AuditLog.user_id == user_id)
         
         # Order by most recent first, limit results
-        logs = query.order_by(AuditLog.timestamp.desc()).limit(limit).all()
+        stmt = stmt.order_by(AuditLog.timestamp.desc()).limit(limit)
+        
+        rows = Session().execute(stmt).mappings().all()
         
-        print(f"✅ Found {len(logs)} audit entries")
+        logger.debug("Found %d audit entries", len(rows))
         
-        # Convert to dictionaries
-        return [log.to_dict() for log in logs]
+        # Build response dicts directly from the row mappings
+        return [{
+            'id': row['id'],
+            'audit_uuid': row['audit_uuid'],
+            'transaction_id': row['transaction_id'],
+            'user_id': row['user_id'],
+            'risk_score': round(row['risk_score'], 3),
+            'decision': row['decision'],
+            'risk_components': orjson.loads(row['risk_components']) if row['risk_components'] else {},
+            'explanation': row['explanation'],
+            'timestamp': row['timestamp'].isoformat() if row['timestamp'] else None
+        } for row in rows]
         
     except Exception as e:
-        print(f"❌ AUDIT FETCH ERROR: {str(e)}")
-        raise Exception(f"Failed to fetch audit logs: {str(e)}")
-    finally:
-        db.close()
\ No newline at end of file
+        logger.error("Audit fetch error: %s", e)
+        raise Exception(f"Failed to fetch audit logs: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Shared helper for the long-lived background threads (audit writer, batch scorer).
+"""
+
+import threading
+
+
+class LazyDaemonThread:
+    """
+    A daemon thread that is started on first use and restarted if it has died.
+    
+    Starting lazily keeps the thread in the serving process: with gunicorn's
+    preload_app the module is imported in the master, and threads don't survive
+    the fork into workers (is_alive() is False there, so the first call restarts it).
+    """
+    
+    def __init__(self, target, name):
+        self._target = target
+        self._name = name
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def ensure_started(self):
+        """Start the thread unless it is already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._target, name=self._name, daemon=True)
+                self._thread.start()
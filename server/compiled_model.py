@@ -0,0 +1,84 @@
+"""
+Treelite/TL2cgen compiled scorer for the IsolationForest, shared by the API
+service (risk_ml) and the standalone training_code service.
+"""
+
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Optional: Treelite + TL2cgen compile the forest into a native scorer.
+# Without them, load_compiled_predictor returns None and callers use sklearn.
+try:
+    import treelite
+    import treelite.sklearn
+    import tl2cgen
+except ImportError:
+    treelite = None
+    tl2cgen = None
+
+# Compiled scorer library, cached next to model.pkl
+COMPILED_MODEL_PATH = 'models/model_quantized.so'
+
+# TL2cgen build options. quantize=1 replaces float64 threshold comparisons with
+# small integer bin indices (exact - bins are the model's own split points)
+COMPILE_PARAMS = {'parallel_comp': 4, 'quantize': 1}
+
+# Rows used to check the compiled scorer against sklearn before trusting it
+_PREDICTOR_CHECK_ROWS = np.array([
+    [1.0, 14, 3, 0, 365],
+    [6.5, 2, 5, 5, 30],
+    [0.2, 9, 0, 2, 1200],
+], dtype=np.float32)
+
+
+def load_compiled_predictor(model, model_path, libpath=COMPILED_MODEL_PATH):
+    """
+    Compile an IsolationForest to a native library with Treelite/TL2cgen
+    (rebuilt whenever model_path is newer) and load it.
+    
+    Args:
+        model: Fitted sklearn IsolationForest
+        model_path: Pickle the model was loaded from (staleness check)
+        libpath: Where the compiled library is written
+    
+    Returns:
+        tl2cgen.Predictor, or None - i.e. use sklearn - if the toolchain is
+        unavailable or the compiled scores don't match sklearn's
+    """
+    if treelite is None:
+        return None
+    
+    try:
+        if not os.path.exists(libpath) or os.path.getmtime(libpath) < os.path.getmtime(model_path):
+            logger.info("Compiling Isolation Forest with Treelite...")
+            tl_model = treelite.sklearn.import_model(model)
+            tl2cgen.export_lib(
+                tl_model,
+                toolchain='gcc',
+                libpath=libpath,
+                params=COMPILE_PARAMS
+            )
+        
+        predictor = tl2cgen.Predictor(libpath)
+        
+        # Sanity check against sklearn before trusting the compiled scorer
+        compiled = predict_raw(predictor, _PREDICTOR_CHECK_ROWS)
+        expected = -model.score_samples(_PREDICTOR_CHECK_ROWS)
+        if not np.allclose(compiled, expected, atol=1e-5):
+            logger.warning("Compiled model disagrees with sklearn - using sklearn scorer")
+            return None
+        
+        logger.info("Loaded compiled Isolation Forest from %s", libpath)
+        return predictor
+    except Exception as e:
+        logger.warning("Treelite compilation unavailable (%s) - using sklearn scorer", e)
+        return None
+
+
+def predict_raw(predictor, features):
+    """Compiled scores for each row; Treelite emits -score_samples (higher = more anomalous)"""
+    return predictor.predict(tl2cgen.DMatrix(features.astype(np.float32, copy=False))).reshape(-1)
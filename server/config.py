@@ -1,15 +1,49 @@
 import os
+import atexit
+import functools
+import logging
+import logging.handlers
+import queue
 from dotenv import load_dotenv
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+
 
 class Config:
-    """Application configuration"""
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    """
+    Application configuration.
+    Values are read lazily on first access, and .env is loaded at most once per process.
+    """
+    _loaded = False
+    
+    @classmethod
+    def load(cls):
+        """Load .env into the environment (no-op after the first call)"""
+        if not cls._loaded:
+            load_dotenv()
+            cls._loaded = True
+    
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def secret_key(cls):
+        cls.load()
+        return os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     
     # Groq API configuration for LLM explanations
     # Why Groq? 10x faster than OpenAI, free tier is generous
-    GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def groq_api_key(cls):
+        cls.load()
+        api_key = os.getenv('GROQ_API_KEY')
+        
+        # Check if Groq API key is loaded (cached, so this only logs once)
+        if api_key:
+            logger.info("Groq API key loaded (starts with: %s...)", api_key[:8])
+        else:
+            logger.warning("GROQ_API_KEY not found in .env - LLM explanations will fail")
+        
+        return api_key
     
     # Database (will add in M5)
     # DB_HOST = os.getenv('DB_HOST', 'localhost')
@@ -17,8 +51,30 @@ class Config:
     # DB_PASSWORD = os.getenv('DB_PASSWORD', '')
     # DB_NAME = os.getenv('DB_NAME', 'anomaly_detector')
 
-# Debug: Check if Groq API key is loaded
-if Config.GROQ_API_KEY:
-    print(f"✅ Groq API key loaded (starts with: {Config.GROQ_API_KEY[:8]}...)")
-else:
-    print("⚠️  WARNING: GROQ_API_KEY not found in .env - LLM explanations will fail")
\ No newline at end of file
+
+_log_listener = None
+
+
+def setup_logging():
+    """
+    Configure root logging once per process. Level comes from LOG_LEVEL (default INFO).
+    Records go onto a queue drained by a background listener, so request
+    handlers never block on stdout writes.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    
+    Config.load()
+    log_queue = queue.SimpleQueue()
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    
+    root = logging.getLogger()
+    root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
\ No newline at end of file
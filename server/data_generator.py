@@ -4,6 +4,7 @@ Generate synthetic transaction data using Faker
 
 from faker import Faker
 import random
+import numpy as np
 from datetime import datetime, timedelta
 
 fake = Faker()
@@ -21,6 +22,58 @@ MERCHANT_CATEGORIES = {
     'luxury': 0.9
 }
 
+# Merchant names per category (tuples: built once, cheap random.choice)
+MERCHANT_NAMES = {
+    'grocery': ('Whole Foods', 'Safeway', 'Trader Joe\'s', 'Kroger'),
+    'gas': ('Shell', 'Chevron', 'BP', 'Exxon'),
+    'restaurant': ('McDonald\'s', 'Chipotle', 'Starbucks', 'Olive Garden'),
+    'retail': ('Target', 'Walmart', 'Costco', 'Best Buy'),
+    'online': ('Amazon', 'eBay', 'Etsy', 'Wayfair'),
+    'electronics': ('Apple Store', 'Best Buy', 'Microsoft Store', 'Newegg'),
+    'travel': ('Expedia', 'Booking.com', 'Airbnb', 'United Airlines'),
+    'jewelry': ('Tiffany & Co', 'Kay Jewelers', 'Zales', 'Blue Nile'),
+    'luxury': ('Gucci', 'Louis Vuitton', 'Rolex', 'Hermès')
+}
+
+# Fallback merchant for categories missing from MERCHANT_NAMES
+_DEFAULT_MERCHANTS = ('Generic Store',)
+
+# Categories and hours used for anomalous transactions
+_ANOMALY_CATEGORIES = ('luxury', 'jewelry', 'electronics', 'travel')
+_NIGHT_HOURS = (0, 1, 2, 3, 4, 22, 23)
+
+# Size of the pre-generated location pool used for anomalous batch transactions
+ANOMALY_LOCATION_POOL_SIZE = 1000
+_anomaly_locations = None
+
+
+def _get_anomaly_locations():
+    """Build the unusual-location pool once, so batches sample from it instead of calling Faker per row"""
+    global _anomaly_locations
+    if _anomaly_locations is None:
+        _anomaly_locations = [
+            fake.city() + ', ' + fake.state_abbr()
+            for _ in range(ANOMALY_LOCATION_POOL_SIZE)
+        ]
+    return _anomaly_locations
+
+
+def _profile_fields(user_profile):
+    """Extract (user_id, avg_transaction, location, preferred_categories) from a dict or object profile"""
+    if isinstance(user_profile, dict):
+        return (
+            user_profile['user_id'],
+            user_profile['avg_transaction'],
+            user_profile['location'],
+            user_profile['preferred_categories']
+        )
+    return (
+        user_profile.user_id,
+        user_profile.avg_transaction,
+        user_profile.location,
+        user_profile.preferred_categories
+    )
+
 
 def generate_transaction(user_profile, is_anomaly=False):
     """
@@ -34,26 +87,15 @@ def generate_transaction(user_profile, is_anomaly=False):
         Dictionary with transaction data
     """
     # Extract user profile data (handle both dict and object)
-    if isinstance(user_profile, dict):
-        user_id = user_profile['user_id']
-        name = user_profile['name']
-        avg_transaction = user_profile['avg_transaction']
-        location = user_profile['location']
-        preferred_categories = user_profile['preferred_categories']
-    else:
-        user_id = user_profile.user_id
-        name = user_profile.name
-        avg_transaction = user_profile.avg_transaction
-        location = user_profile.location
-        preferred_categories = user_profile.preferred_categories
+    user_id, avg_transaction, location, preferred_categories = _profile_fields(user_profile)
     
     if is_anomaly:
         # Anomalous transaction: high amount, unusual category, odd time
         amount = avg_transaction * random.uniform(3.0, 8.0)
-        category = random.choice(['luxury', 'jewelry', 'electronics', 'travel'])
+        category = random.choice(_ANOMALY_CATEGORIES)
         
         # Unusual time (late night or early morning)
-        hour = random.choice(list(range(0, 5)) + list(range(22, 24)))
+        hour = random.choice(_NIGHT_HOURS)
         timestamp = datetime.now().replace(
             hour=hour,
             minute=random.randint(0, 59),
@@ -76,19 +118,7 @@ def generate_transaction(user_profile, is_anomaly=False):
         )
     
     # Generate merchant name based on category
-    merchant_names = {
-        'grocery': ['Whole Foods', 'Safeway', 'Trader Joe\'s', 'Kroger'],
-        'gas': ['Shell', 'Chevron', 'BP', 'Exxon'],
-        'restaurant': ['McDonald\'s', 'Chipotle', 'Starbucks', 'Olive Garden'],
-        'retail': ['Target', 'Walmart', 'Costco', 'Best Buy'],
-        'online': ['Amazon', 'eBay', 'Etsy', 'Wayfair'],
-        'electronics': ['Apple Store', 'Best Buy', 'Microsoft Store', 'Newegg'],
-        'travel': ['Expedia', 'Booking.com', 'Airbnb', 'United Airlines'],
-        'jewelry': ['Tiffany & Co', 'Kay Jewelers', 'Zales', 'Blue Nile'],
-        'luxury': ['Gucci', 'Louis Vuitton', 'Rolex', 'Hermès']
-    }
-    
-    merchant = random.choice(merchant_names.get(category, ['Generic Store']))
+    merchant = random.choice(MERCHANT_NAMES.get(category, _DEFAULT_MERCHANTS))
     
     return {
         'user_id': user_id,
@@ -97,4 +127,65 @@ def generate_transaction(user_profile, is_anomaly=False):
         'merchant_category': category,
         'location': location,
         'timestamp': timestamp.isoformat() + 'Z'
-    }
\ No newline at end of file
+    }
+
+
+def generate_batch_transactions(user_profile, count, is_anomaly=False):
+    """
+    Generate many synthetic transactions for a user profile in one pass.
+    
+    All random draws are made up front as NumPy arrays, and anomalous
+    locations come from a pre-generated pool, so the per-row loop only
+    indexes into precomputed values instead of re-entering Faker/random.
+    
+    Args:
+        user_profile: Dictionary (or object) with user profile data
+        count: Number of transactions to generate
+        is_anomaly: Boolean, whether to generate anomalous transactions
+    
+    Returns:
+        List of transaction dictionaries (same shape as generate_transaction)
+    """
+    user_id, avg_transaction, home_location, preferred_categories = _profile_fields(user_profile)
+    rng = np.random.default_rng()
+    
+    if is_anomaly:
+        # High amount, unusual category, late night / early morning, different location
+        multipliers = rng.uniform(3.0, 8.0, size=count)
+        categories = _ANOMALY_CATEGORIES
+        hours = rng.choice(_NIGHT_HOURS, size=count)
+        location_pool = _get_anomaly_locations()
+        location_idx = rng.integers(0, len(location_pool), size=count).tolist()
+    else:
+        # Typical amount, preferred category, normal business hours
+        multipliers = rng.uniform(0.5, 2.0, size=count)
+        categories = tuple(preferred_categories)
+        hours = rng.integers(8, 23, size=count)
+    
+    amounts = np.round(avg_transaction * multipliers, 2).tolist()
+    category_idx = rng.integers(0, len(categories), size=count).tolist()
+    merchant_picks = rng.random(size=count).tolist()
+    
+    # Read the clock once, then build every ISO timestamp with one vectorized
+    # pass: today's date + random time of day (keeps now's microseconds, like .replace())
+    minutes = rng.integers(0, 60, size=count)
+    seconds = rng.integers(0, 60, size=count)
+    day_start = np.datetime64(datetime.now().replace(hour=0, minute=0, second=0))
+    offsets = (hours * 3600 + minutes * 60 + seconds).astype('timedelta64[s]')
+    timestamps = np.datetime_as_string(day_start + offsets, unit='us').tolist()
+    
+    transactions = []
+    for i in range(count):
+        category = categories[category_idx[i]]
+        merchants = MERCHANT_NAMES.get(category, _DEFAULT_MERCHANTS)
+        
+        transactions.append({
+            'user_id': user_id,
+            'amount': amounts[i],
+            'merchant': merchants[int(merchant_picks[i] * len(merchants))],
+            'merchant_category': category,
+            'location': location_pool[location_idx[i]] if is_anomaly else home_location,
+            'timestamp': timestamps[i] + 'Z'
+        })
+    
+    return transactions
\ No newline at end of file
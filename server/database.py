@@ -2,26 +2,63 @@
 User profiles and database models
 """
 
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime
-from sqlalchemy import create_engine
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Index
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
+from dataclasses import dataclass, field
 from datetime import datetime
+import orjson
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 # SQLite database file location
 DB_PATH = os.path.join(os.path.dirname(__file__), 'transactions.db')
 DATABASE_URL = f'sqlite:///{DB_PATH}'
 
-# Create engine
+# Create engine with an explicit connection pool so concurrent requests
+# reuse connections instead of paying setup cost each time
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False},
+    # timeout: wait up to 30s on a locked database instead of failing immediately
+    connect_args={"check_same_thread": False, "timeout": 30},
+    poolclass=QueuePool,
+    pool_size=10,
+    max_overflow=20,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    # Compiled-statement cache (SQLAlchemy 2.x); set echo="debug" to see
+    # "[cached since ...]" markers confirming hits
+    query_cache_size=1200,
     echo=False
 )
 
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune each new SQLite connection for concurrent access.
+    WAL lets readers proceed while a write is in progress, and
+    synchronous=NORMAL skips the extra fsync per commit (safe under WAL).
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    cursor.execute("PRAGMA cache_size=-64000")  # ~64 MB
+    cursor.close()
+
+
 # Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps loaded attributes (e.g. new IDs) readable after commit/close
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+
+# Request-scoped sessions: one per request, released by the app's teardown hook
+Session = scoped_session(SessionLocal)
 
 # Base class for models
 Base = declarative_base()
@@ -36,18 +73,72 @@ def get_db():
         db.close()
 
 
+# One-shot migrations for databases created before these indexes existed.
+# create_all() only creates missing tables, not new indexes on existing ones.
+# Columns added after the first release: (table, column, SQL type).
+# SQLite has no ADD COLUMN IF NOT EXISTS, so run_migrations checks table_info first.
+COLUMN_MIGRATIONS = [
+    ('audit_log', 'audit_uuid', 'VARCHAR(32)'),
+]
+
+MIGRATIONS = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_audit_log_audit_uuid ON audit_log (audit_uuid)",
+    "CREATE INDEX IF NOT EXISTS ix_audit_user_time ON audit_log (user_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS ix_audit_log_timestamp ON audit_log (timestamp)",
+    "CREATE INDEX IF NOT EXISTS ix_audit_txn_time ON audit_log (transaction_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS ix_txn_anomaly_user ON transactions (is_anomaly, user_id)",
+    # Superseded by ix_txn_anomaly_user (same leading column)
+    "DROP INDEX IF EXISTS ix_transactions_is_anomaly",
+    "CREATE INDEX IF NOT EXISTS ix_txn_user_time ON transactions (user_id, timestamp)",
+    # Superseded by ix_txn_user_time (same leading column)
+    "DROP INDEX IF EXISTS ix_transactions_user_id",
+    "CREATE INDEX IF NOT EXISTS ix_txn_anomaly_time ON transactions (is_anomaly, timestamp)",
+    "CREATE INDEX IF NOT EXISTS ix_txn_time ON transactions (timestamp)",
+]
+
+
+def run_migrations():
+    """Apply idempotent schema migrations"""
+    with engine.begin() as conn:
+        for table, column, column_type in COLUMN_MIGRATIONS:
+            existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+        for statement in MIGRATIONS:
+            conn.execute(text(statement))
+
+
+_db_initialized = False
+
+
 def init_db():
-    """Initialize database - create all tables"""
+    """Initialize database - create all tables and apply migrations. Safe to call more than once."""
+    global _db_initialized
+    if _db_initialized:
+        return
     Base.metadata.create_all(bind=engine)
-    print("Database initialized successfully")
+    run_migrations()
+    _db_initialized = True
+    logger.info("Database initialized successfully")
 
 
 class Transaction(Base):
     """SQLAlchemy model for transactions"""
     __tablename__ = 'transactions'
     
+    # Composite indexes: /transactions listings (each filter combination reads the
+    # newest rows straight off an index, walked backwards for ORDER BY timestamp DESC,
+    # so LIMIT stops early and no sort step is needed), per-user time-window range
+    # scans, and the stats GROUP BY is_anomaly, user_id (answered from the index alone)
+    __table_args__ = (
+        Index('ix_txn_user_time', 'user_id', 'timestamp'),
+        Index('ix_txn_anomaly_time', 'is_anomaly', 'timestamp'),
+        Index('ix_txn_time', 'timestamp'),
+        Index('ix_txn_anomaly_user', 'is_anomaly', 'user_id'),
+    )
+    
     transaction_id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(String, nullable=False, index=True)
+    user_id = Column(String, nullable=False)
     amount = Column(Float, nullable=False)
     merchant = Column(String, nullable=False)
     merchant_category = Column(String, nullable=False)
@@ -74,9 +165,20 @@ class AuditLog(Base):
     """
     __tablename__ = 'audit_log'
     
+    # Composite index for "latest N entries for a user" lookups (get_audit_logs).
+    # SQLite walks it backwards for ORDER BY timestamp DESC, so no sort step is needed.
+    # ix_audit_txn_time serves "latest entry for a transaction" (attaching explanations).
+    __table_args__ = (
+        Index('ix_audit_user_time', 'user_id', 'timestamp'),
+        Index('ix_audit_txn_time', 'transaction_id', 'timestamp'),
+    )
+    
     # Primary key - auto-incrementing ID
     id = Column(Integer, primary_key=True, autoincrement=True)
     
+    # Client-assigned ID, known before the (batched) insert is committed
+    audit_uuid = Column(String(32), unique=True, index=True, nullable=True)
+    
     # Transaction reference
     transaction_id = Column(Integer, nullable=False)
     user_id = Column(String(50), nullable=False)
@@ -92,40 +194,42 @@ class AuditLog(Base):
     explanation = Column(String, nullable=True)
     
     # Audit metadata
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     def __repr__(self):
         return f"<AuditLog {self.id}: {self.decision} for txn {self.transaction_id}>"
     
     def to_dict(self):
         """Convert audit log entry to dictionary for JSON response"""
-        import json
         return {
             'id': self.id,
+            'audit_uuid': self.audit_uuid,
             'transaction_id': self.transaction_id,
             'user_id': self.user_id,
             'risk_score': round(self.risk_score, 3),
             'decision': self.decision,
-            'risk_components': json.loads(self.risk_components) if self.risk_components else {},
+            'risk_components': orjson.loads(self.risk_components) if self.risk_components else {},
             'explanation': self.explanation,
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
     
+@dataclass(slots=True, frozen=True)
 class UserProfile:
-    """Represents a customer profile with transaction patterns"""
-    
-    def __init__(self, user_id, name, account_age_days, avg_transaction, 
-                 location, trust_score, preferred_categories):
-        self.user_id = user_id
-        self.name = name
-        self.account_age_days = account_age_days
-        self.avg_transaction = avg_transaction
-        self.location = location
-        self.trust_score = trust_score
-        self.preferred_categories = preferred_categories
+    """Represents a customer profile with transaction patterns (immutable)"""
+    user_id: str
+    name: str
+    account_age_days: int
+    avg_transaction: float
+    location: str
+    trust_score: float
+    preferred_categories: tuple
+    _as_dict: dict = field(init=False, repr=False, compare=False)
     
-    def to_dict(self):
-        return {
+    def __post_init__(self):
+        # Frozen dataclass: assign derived fields through object.__setattr__.
+        # The dict is built once and shared, so callers must not mutate it.
+        object.__setattr__(self, 'preferred_categories', tuple(self.preferred_categories))
+        object.__setattr__(self, '_as_dict', {
             "user_id": self.user_id,
             "name": self.name,
             "account_age_days": self.account_age_days,
@@ -133,7 +237,10 @@ class UserProfile:
             "location": self.location,
             "trust_score": self.trust_score,
             "preferred_categories": self.preferred_categories
-        }
+        })
+    
+    def to_dict(self):
+        return self._as_dict
 
 
 # Hardcoded user profiles for demo
@@ -145,7 +252,7 @@ USER_PROFILES = {
         avg_transaction=150.0,
         location="New York, NY",
         trust_score=0.95,
-        preferred_categories=["grocery", "gas", "restaurant"]
+        preferred_categories=("grocery", "gas", "restaurant")
     ),
     "bob": UserProfile(
         user_id="bob",
@@ -154,7 +261,7 @@ USER_PROFILES = {
         avg_transaction=300.0,
         location="Los Angeles, CA",
         trust_score=0.75,
-        preferred_categories=["electronics", "online", "travel"]
+        preferred_categories=("electronics", "online", "travel")
     ),
     "charlie": UserProfile(
         user_id="charlie",
@@ -163,21 +270,27 @@ USER_PROFILES = {
         avg_transaction=500.0,
         location="Miami, FL",
         trust_score=0.40,
-        preferred_categories=["luxury", "jewelry", "online"]
+        preferred_categories=("luxury", "jewelry", "online")
     )
 }
 
 
+# Profiles are static demo data, so serialize them once at import.
+# Callers get shared dicts and must treat them as read-only.
+_PROFILE_DICT_CACHE = {user_id: profile.to_dict() for user_id, profile in USER_PROFILES.items()}
+_ALL_PROFILES_LIST = list(_PROFILE_DICT_CACHE.values())
+
+
 def get_user_profile(user_id):
-    """Retrieve user profile by ID"""
-    profile = USER_PROFILES.get(user_id)
-    return profile.to_dict() if profile else None
+    """
+    Retrieve user profile by ID.
+    
+    Profiles are static and serialized once at import (_PROFILE_DICT_CACHE), so this
+    is a single dict lookup returning the shared dict - callers must not mutate it.
+    """
+    return _PROFILE_DICT_CACHE.get(user_id)
 
 
 def get_all_profiles():
     """Get all available user profiles as a list"""
-    return [profile.to_dict() for profile in USER_PROFILES.values()]
-
-
-# Create tables on import
-Base.metadata.create_all(engine)
\ No newline at end of file
+    return _ALL_PROFILES_LIST
@@ -0,0 +1,31 @@
+"""
+Gunicorn settings for the API server.
+
+Run from the repository root:
+    gunicorn -c server/gunicorn.conf.py wsgi:app
+"""
+
+import multiprocessing
+import os
+
+# Groq HTTP calls are I/O-bound, so each worker is a gevent loop. SQLite queries
+# still block their worker (C extension, not patched by gevent), hence several workers.
+worker_class = 'gevent'
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', 500))
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+pythonpath = 'server'
+
+# Production logs warnings and errors only (override with LOG_LEVEL=DEBUG/INFO)
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+# Load the app (and the memory-mapped model) once in the master so forked
+# workers share its pages
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Connections opened in the master (init_db) must not be shared across processes
+    from database import engine
+    engine.dispose(close=False)
@@ -1,32 +1,168 @@
-import pickle
+import os
+import joblib
+import asyncio
+import queue
+import threading
+import time
+import httpx
+import logging
 import numpy as np
-from groq import Groq
+from groq import Groq, AsyncGroq
 from config import Config
+from background import LazyDaemonThread
+from compiled_model import load_compiled_predictor, predict_raw
 import json
 import shap
 from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Optional: ciso8601 parses ISO-8601 in C and accepts a 'Z' suffix as-is.
+# Without it, parse_timestamp falls back to datetime.fromisoformat.
+try:
+    from ciso8601 import parse_datetime as _parse_iso8601
+except ImportError:
+    _parse_iso8601 = None
+
+# Feature column order expected by the IsolationForest
+FEATURE_ORDER = ('amount_ratio', 'hour', 'day', 'merchant_category_encoded', 'account_age_days')
+
+# Simple merchant category encoding (unknown categories map to 0)
+MERCHANT_CATEGORIES = ('retail', 'restaurant', 'online', 'gas', 'grocery', 'travel', 'entertainment')
+_MERCHANT_IDX = {category: i for i, category in enumerate(MERCHANT_CATEGORIES)}
+
+# Micro-batching window for concurrent /score-transaction requests
+SCORE_BATCH_MAX_SIZE = 64
+SCORE_BATCH_WINDOW_SECONDS = 0.01
+
+# Max number of quantized feature tuples whose SHAP explanations are memoized
+SHAP_CACHE_SIZE = 8192
+
+# Threads used by IsolationForest.decision_function (parallel over trees, sklearn >= 1.6)
+MODEL_N_JOBS = int(os.getenv('MODEL_N_JOBS', '-1'))
+
+
+def parse_timestamp(value):
+    """Parse an ISO-8601 timestamp ('Z' suffix allowed). Parse once at the HTTP boundary and pass the datetime along."""
+    if _parse_iso8601 is not None:
+        return _parse_iso8601(value)
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class BatchScorer:
+    """
+    Coalesces concurrent single-row scoring requests into one vectorized call.
+    
+    Each caller enqueues its feature row and blocks on a Future. A background
+    worker collects rows for up to SCORE_BATCH_WINDOW_SECONDS (or
+    SCORE_BATCH_MAX_SIZE rows), scores them together, then fans results back out.
+    Works with real threads and with gevent-patched threading/queue alike.
+    """
+    
+    def __init__(self, score_batch, max_batch=SCORE_BATCH_MAX_SIZE, window=SCORE_BATCH_WINDOW_SECONDS):
+        self._score_batch = score_batch
+        self._max_batch = max_batch
+        self._window = window
+        self._queue = queue.Queue()
+        self._worker = LazyDaemonThread(self._run, name='batch-scorer')
+    
+    def submit(self, feature_row):
+        """Score one feature row (blocks until its batch has been scored)"""
+        self._worker.ensure_started()
+        future = Future()
+        self._queue.put((feature_row, future))
+        return future.result()
+    
+    def _collect_batch(self):
+        """Block for the first request, then gather more until the window closes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._window
+        while len(batch) < self._max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                results = self._score_batch([row for row, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                    continue
+                # Don't fail unrelated callers: rescore row by row so only the bad row errors
+                logger.warning("Scoring batch of %d failed (%s) - rescoring rows individually", len(batch), e)
+                for row, future in batch:
+                    try:
+                        future.set_result(self._score_batch([row])[0])
+                    except Exception as row_error:
+                        future.set_exception(row_error)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
 
 class RiskMLService:
+    """
+    Process-wide scoring service (routes.risk_service). The model, explainer and
+    compiled predictor are heavy, so constructing a second instance is an error.
+    """
+    _instance = None
+    
     def __init__(self, model_path='models/model.pkl'):
-        with open(model_path, 'rb') as f:
-            self.model = pickle.load(f)
-        self.explainer = shap.TreeExplainer(self.model)
+        if RiskMLService._instance is not None:
+            raise RuntimeError("RiskMLService is a singleton - reuse routes.risk_service")
+        
+        # mmap_mode='r' maps the model's numpy buffers from the file instead of
+        # copying them, so preloaded gunicorn workers share those pages
+        self.model = joblib.load(model_path, mmap_mode='r')
+        # n_jobs is part of the pickled estimator state, so override it at load time
+        self.model.n_jobs = MODEL_N_JOBS
+        # sklearn model stays loaded as the SHAP explainer backing (and fallback scorer)
+        # No background dataset needed: path-dependent TreeSHAP uses the trees' own cover
+        self.explainer = shap.TreeExplainer(
+            self.model,
+            feature_perturbation='tree_path_dependent',
+            model_output='raw'
+        )
+        self.predictor = load_compiled_predictor(self.model, model_path)
+        self.batcher = BatchScorer(self.score_batch)
+        # Reused feature matrix, only written by the batch scorer's single worker thread
+        self._feature_buf = np.empty((SCORE_BATCH_MAX_SIZE, len(FEATURE_ORDER)), dtype=np.float32)
+        # quantized feature tuple -> top-3 SHAP dict (LRU, also only touched by the worker thread)
+        self._shap_cache = OrderedDict()
+        
+        RiskMLService._instance = self
+    
+    def decision_scores(self, features):
+        """IsolationForest decision_function for each row (compiled scorer when available)"""
+        if self.predictor is not None:
+            # Treelite emits -score_samples; decision_function = score_samples - offset_
+            return -predict_raw(self.predictor, features) - self.model.offset_
+        return self.model.decision_function(features)
     
     def extract_features(self, transaction, user_profile):
-        """Extract features from transaction for ML model"""
+        """Extract features from transaction for ML model (plain dict - matrices are built per batch)"""
         amount_ratio = transaction['amount'] / user_profile['avg_transaction']
-        hour = datetime.fromisoformat(transaction['timestamp'].replace('Z', '+00:00')).hour
-        day = datetime.fromisoformat(transaction['timestamp'].replace('Z', '+00:00')).weekday()
+        # Routes pre-parse the timestamp into '_ts'; parse here only for other callers
+        ts = transaction.get('_ts') or parse_timestamp(transaction['timestamp'])
+        hour = ts.hour
+        day = ts.weekday()
         
         # Simple merchant category encoding
-        merchant_categories = ['retail', 'restaurant', 'online', 'gas', 'grocery', 'travel', 'entertainment']
-        merchant_category_encoded = merchant_categories.index(transaction['merchant_category']) if transaction['merchant_category'] in merchant_categories else 0
+        merchant_category_encoded = _MERCHANT_IDX.get(transaction['merchant_category'], 0)
         
         account_age_days = user_profile['account_age_days']
-        features = np.array([[amount_ratio, hour, day, merchant_category_encoded, account_age_days]])
         
         return {
-            'features': features,
             'amount_ratio': amount_ratio,
             'hour': hour,
             'day': day,
@@ -34,133 +170,239 @@ class RiskMLService:
             'account_age_days': account_age_days
         }
     
-    def score_transaction(self, transaction, user_profile):
-        """Score transaction with ML model and return SHAP explanations"""
-        try:
-            print("AKSHY_transaction:", transaction)
-            feature_data = self.extract_features(transaction, user_profile)
-            print("="*15)
-            print(f"Extracted features shape: {feature_data['features'].shape}")
-            features = feature_data['features']
-            print(f"Features array: {features}")
-            
-            # Get anomaly score (Isolation Forest returns -1 to 1, convert to 0 to 1)
-            anomaly_score_raw = self.model.decision_function(features)[0]
-            print(f"Raw anomaly score: {anomaly_score_raw}")
-            # Normalize to 0-1 range (higher = more anomalous)
-            anomaly_score = 1 / (1 + np.exp(anomaly_score_raw))
-            print(f"Normalized anomaly score: {anomaly_score}")
-            
-            # Calculate SHAP values
-            shap_values = self.explainer.shap_values(features)
+    def build_feature_matrix(self, feature_rows):
+        """Fill one contiguous float32 matrix (rows in FEATURE_ORDER) from extracted feature dicts"""
+        n_rows = len(feature_rows)
+        if n_rows <= len(self._feature_buf):
+            # View into the preallocated buffer, overwritten by the next batch
+            features = self._feature_buf[:n_rows]
+        else:
+            features = np.empty((n_rows, len(FEATURE_ORDER)), dtype=np.float32)
+        for i, row in enumerate(feature_rows):
+            features[i] = [row[name] for name in FEATURE_ORDER]
+        return features
+    
+    @staticmethod
+    def quantize_features(feature_data):
+        """Round features into a hashable SHAP cache key (ratio to 0.01, 30-day age buckets)"""
+        return (
+            round(float(feature_data['amount_ratio']), 2),
+            int(feature_data['hour']),
+            int(feature_data['day']),
+            int(feature_data['merchant_category_encoded']),
+            int(feature_data['account_age_days']) // 30
+        )
+    
+    def shap_explanations(self, keys):
+        """
+        Top-3 SHAP features for each quantized key. Cache misses are rebuilt into
+        rows (age bucket -> its first day) and explained in one shap_values call.
+        """
+        cache = self._shap_cache
+        found = {}
+        
+        # Touch and read the hits before anything is inserted, so evicting for
+        # the misses can never drop a key this batch still needs
+        for key in keys:
+            if key in cache and key not in found:
+                cache.move_to_end(key)
+                found[key] = cache[key]
+        misses = [key for key in dict.fromkeys(keys) if key not in found]
+        
+        if misses:
+            rows = np.array(misses, dtype=np.float32)
+            rows[:, 4] *= 30
+            # Additivity check is a second full pass - skip it on the serving path
+            shap_values = self.explainer.shap_values(rows, check_additivity=False)
             feature_names = ['amount_ratio', 'hour', 'day', 'merchant_category']
             
-            # Get top 3 features by absolute SHAP value
-            shap_dict = {name: float(value) for name, value in zip(feature_names, shap_values[0])}
-            sorted_shap = sorted(shap_dict.items(), key=lambda x: abs(x[1]), reverse=True)[:3]
-            
-            return {
+            for key, shap_row in zip(misses, shap_values):
+                # Get top 3 features by absolute SHAP value
+                shap_dict = {name: float(value) for name, value in zip(feature_names, shap_row)}
+                found[key] = dict(sorted(shap_dict.items(), key=lambda x: abs(x[1]), reverse=True)[:3])
+        
+        results = [dict(found[key]) for key in keys]  # copy - cached dicts are shared
+        
+        for key in misses:
+            cache[key] = found[key]
+            if len(cache) > SHAP_CACHE_SIZE:
+                cache.popitem(last=False)
+        return results
+    
+    def score_batch(self, feature_rows):
+        """
+        Score many extracted feature dicts at once: one decision_function call
+        and (for SHAP cache misses only) one shap_values call for the whole batch.
+        """
+        features = self.build_feature_matrix(feature_rows)
+        
+        # Get anomaly score (Isolation Forest returns -1 to 1, convert to 0 to 1)
+        anomaly_scores_raw = self.decision_scores(features)
+        # Normalize to 0-1 range (higher = more anomalous)
+        anomaly_scores = 1 / (1 + np.exp(anomaly_scores_raw))
+        
+        # SHAP explanations, memoized per quantized feature tuple
+        shap_features = self.shap_explanations([self.quantize_features(row) for row in feature_rows])
+        
+        results = []
+        for feature_data, anomaly_score, top_shap in zip(feature_rows, anomaly_scores, shap_features):
+            results.append({
                 'anomaly_score': float(anomaly_score),
-                'shap_features': dict(sorted_shap),
+                'shap_features': top_shap,
                 'raw_features': {
                     'amount_ratio': float(feature_data['amount_ratio']),
                     'hour': int(feature_data['hour']),
                     'day': int(feature_data['day']),
                     'merchant_category_encoded': int(feature_data['merchant_category_encoded'])
                 }
-            }
-        except Exception as e:
-            raise Exception(f"Error scoring transaction: {str(e)}")
+            })
+        return results
     
-    def calculate_risk_score(self, transaction, user_profile, ml_score, recent_transactions):
-        """
-        Calculate multi-factor risk score combining ML + business rules
-        
-        Components:
-        - model_anomaly (0.4): ML model's assessment
-        - amount_ratio (0.3): Transaction size vs user's average
-        - user_trust (0.2): Account age (newer accounts = higher risk)
-        - velocity (0.1): Recent transaction count
-        """
+    def score_transaction(self, transaction, user_profile):
+        """Score transaction with ML model and return SHAP explanations (micro-batched)"""
         try:
-            # Component 1: Model Anomaly (weight 0.4)
-            model_anomaly_value = ml_score
-            model_anomaly_weight = 0.4
-            model_anomaly_contribution = model_anomaly_value * model_anomaly_weight
-            
-            # Component 2: Amount Ratio (weight 0.3)
-            # High ratio = high risk, cap at 3x for scoring
-            amount_ratio = transaction['amount'] / user_profile['avg_transaction']
-            amount_ratio_normalized = min(amount_ratio / 3.0, 1.0)  # Normalize to 0-1
-            amount_ratio_weight = 0.3
-            amount_ratio_contribution = amount_ratio_normalized * amount_ratio_weight
-            
-            # Component 3: User Trust (weight 0.2)
-            # Newer accounts = less trust = higher risk
-            # 0 days = 1.0 risk, 365+ days = 0.0 risk
-            account_age_days = user_profile['account_age_days']
-            user_trust_value = max(0, 1.0 - (account_age_days / 365.0))
-            user_trust_weight = 0.2
-            user_trust_contribution = user_trust_value * user_trust_weight
-            
-            # Component 4: Velocity (weight 0.1)
-            # More transactions in last hour = higher risk
-            # 0 txns = 0.0 risk, 5+ txns = 1.0 risk
-            velocity_count = len(recent_transactions)
-            velocity_value = min(velocity_count / 5.0, 1.0)
-            velocity_weight = 0.1
-            velocity_contribution = velocity_value * velocity_weight
-            
-            # Calculate final risk score
-            risk_score = (
-                model_anomaly_contribution +
-                amount_ratio_contribution +
-                user_trust_contribution +
-                velocity_contribution
-            )
-            
-            # Determine decision
-            if risk_score > 0.7:
-                decision = "DECLINE"
-            elif risk_score >= 0.4:
-                decision = "MANUAL REVIEW"
-            else:
-                decision = "APPROVE"
+            feature_data = self.extract_features(transaction, user_profile)
+            logger.debug("Extracted features: %s", feature_data)
             
-            return {
-                'risk_score': float(risk_score),
-                'decision': decision,
-                'components': {
-                    'model_anomaly': {
-                        'value': float(model_anomaly_value),
-                        'weight': model_anomaly_weight,
-                        'contribution': float(model_anomaly_contribution)
-                    },
-                    'amount_ratio': {
-                        'value': float(amount_ratio_normalized),
-                        'weight': amount_ratio_weight,
-                        'contribution': float(amount_ratio_contribution),
-                        'raw_ratio': float(amount_ratio)
-                    },
-                    'user_trust': {
-                        'value': float(user_trust_value),
-                        'weight': user_trust_weight,
-                        'contribution': float(user_trust_contribution),
-                        'account_age_days': account_age_days
-                    },
-                    'velocity': {
-                        'value': float(velocity_value),
-                        'weight': velocity_weight,
-                        'contribution': float(velocity_contribution),
-                        'recent_count': velocity_count
-                    }
-                }
-            }
+            result = self.batcher.submit(feature_data)
+            logger.debug("Normalized anomaly score: %s", result['anomaly_score'])
+            return result
         except Exception as e:
-            raise Exception(f"Error calculating risk score: {str(e)}")
-        
-# FIND the generate_explanation function (around line 160-245)
-# REPLACE THE ENTIRE FUNCTION WITH THIS CORRECTED VERSION:
+            raise Exception(f"Error scoring transaction: {str(e)}")
+
+
+# Groq request settings shared by the sync and async explanation paths
+GROQ_MODEL = "llama-3.3-70b-versatile"  # Best speed/quality balance
+GROQ_SYSTEM_PROMPT = "You are a concise financial risk analyst. Respond in <100 tokens."
+
+# Connection pool limits shared by the sync and async Groq HTTP clients
+GROQ_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# Shared sync Groq client (None when no API key is configured). Its pooled
+# httpx client keeps TLS connections alive across requests.
+_client = (
+    Groq(api_key=Config.groq_api_key(), http_client=httpx.Client(limits=GROQ_HTTP_LIMITS))
+    if Config.groq_api_key() else None
+)
+
+# Explanation memo: coarse fingerprint -> (expires_at, explanation).
+# Repeating risk archetypes reuse the first explanation instead of calling Groq again.
+EXPLANATION_CACHE_SIZE = 4096
+EXPLANATION_TTL_SECONDS = 3600
+FALLBACK_TTL_SECONDS = 60  # Negative cache: retry Groq soon after a failure
+_explanation_cache = OrderedDict()
+_explanation_cache_lock = threading.Lock()
+
+
+def _explanation_fingerprint(transaction: dict, risk_components: dict, decision: str) -> tuple:
+    """
+    Bucket the prompt inputs: decision, merchant category, account age in
+    30-day bins and every risk component value rounded to 0.1. This is both the
+    cache key and the only input to _build_prompt/_fallback_explanation.
+    """
+    account_age = risk_components.get('user_trust', {}).get('account_age_days', 0)
+    component_buckets = tuple(
+        (name, round(float(component.get('value', 0)), 1))
+        for name, component in sorted(risk_components.items())
+        if isinstance(component, dict)
+    )
+    return (decision, transaction.get('merchant_category'), int(account_age) // 30, component_buckets)
+
+
+def _cache_get(key):
+    """Return a cached explanation, or None if missing/expired"""
+    with _explanation_cache_lock:
+        entry = _explanation_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, explanation = entry
+        if expires_at < time.monotonic():
+            del _explanation_cache[key]
+            return None
+        _explanation_cache.move_to_end(key)
+        return explanation
+
+
+def _cache_put(key, explanation, ttl):
+    """Store an explanation, evicting the least recently used entry when full"""
+    with _explanation_cache_lock:
+        _explanation_cache[key] = (time.monotonic() + ttl, explanation)
+        _explanation_cache.move_to_end(key)
+        if len(_explanation_cache) > EXPLANATION_CACHE_SIZE:
+            _explanation_cache.popitem(last=False)
+
+
+# Prompt labels for risk component names (unknown names are shown as-is)
+_COMPONENT_LABELS = {
+    'ml_anomaly': 'ML Anomaly Score',
+    'model_anomaly': 'ML Anomaly Score',
+    'amount_ratio': 'Amount Ratio Score',
+    'user_trust': 'User Trust Risk',
+    'velocity': 'Velocity Score',
+}
+
+
+def _build_prompt(fingerprint: tuple) -> str:
+    """
+    Build the LLM prompt from the explanation fingerprint only.
+    
+    Explanations are cached by fingerprint, so the prompt must not contain anything
+    the fingerprint doesn't (amount, merchant, user, time) - otherwise a cache hit
+    could serve text describing another user's transaction.
+    """
+    decision, merchant_category, age_bucket, component_buckets = fingerprint
+    account_age = f"{age_bucket * 30}+ days" if age_bucket else "unknown"
+    components = "\n".join(
+        f"- {_COMPONENT_LABELS.get(name, name)}: {value:.1f}/1.0"
+        for name, value in component_buckets
+    )
+    
+    return f"""You are a financial risk analyst. Explain this transaction decision in <100 tokens.
+
+TRANSACTION:
+- Merchant category: {merchant_category or 'unknown'}
+- Account age: {account_age}
+
+RISK ANALYSIS (weights: ML anomaly 40%, amount ratio 30%, user trust 20%, velocity 10%):
+{components}
+
+DECISION: {decision}
+
+Explain why this decision was made. Focus on the top 2 risk factors. Be concise and actionable.
+Do not mention specific amounts, merchants, users or times."""
+
+
+def _completion_kwargs(prompt: str) -> dict:
+    """Arguments for chat.completions.create, identical for Groq and AsyncGroq"""
+    return {
+        'model': GROQ_MODEL,
+        'messages': [
+            {
+                "role": "system",
+                "content": GROQ_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        'max_tokens': 150,  # Hard limit to prevent verbose responses
+        'temperature': 0.3,  # Low temp = more deterministic/factual
+        'timeout': 10  # Fail fast if Groq is slow
+    }
+
+
+def _fallback_explanation(fingerprint: tuple) -> str:
+    """Template explanation used when the LLM call fails (built from the fingerprint, like the prompt)"""
+    decision = fingerprint[0]
+    try:
+        top = sorted(fingerprint[3], key=lambda item: item[1], reverse=True)[:2]
+        factors = " and ".join(f"{_COMPONENT_LABELS.get(name, name)} ({value:.1f})" for name, value in top)
+        return f"Decision: {decision}. Primary risk factors: {factors}."
+    except Exception:
+        # Ultimate fallback if even that fails
+        return f"Decision: {decision}. Unable to generate detailed explanation due to technical error."
+
 
 def generate_explanation(transaction: dict, risk_components: dict, decision: str) -> str:
     """
@@ -180,84 +422,172 @@ def generate_explanation(transaction: dict, risk_components: dict, decision: str
     Returns:
         <100 token plain English explanation
     """
+    cache_key = _explanation_fingerprint(transaction, risk_components, decision)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        logger.debug("LLM explanation served from cache")
+        return cached
+    
     try:
-        print(f"=== GROQ LLM EXPLANATION START ===")
-        print(f"Decision: {decision}")
-        print(f"Risk components structure: {risk_components.keys()}")
-        
-        # Extract values from nested structure
-        model_anomaly = risk_components.get('model_anomaly', {}).get('value', 0)
-        amount_ratio_raw = risk_components.get('amount_ratio', {}).get('raw_ratio', 1)
-        user_trust = risk_components.get('user_trust', {}).get('value', 0)
-        velocity = risk_components.get('velocity', {}).get('value', 0)
-        account_age = risk_components.get('user_trust', {}).get('account_age_days', 0)
-        
-        print(f"Extracted values - ML: {model_anomaly:.2f}, Amount Ratio: {amount_ratio_raw:.2f}x")
-        
         # Check if API key exists
-        if not Config.GROQ_API_KEY:
-            print("❌ GROQ_API_KEY not configured")
+        if _client is None:
             raise ValueError("Groq API key not found in environment")
         
-        # Initialize Groq client
-        client = Groq(api_key=Config.GROQ_API_KEY)
+        # Prompt from the cache key's fields only
+        prompt = _build_prompt(cache_key)
         
-        # Build context-rich prompt
-        prompt = f"""You are a financial risk analyst. Explain this transaction decision in <100 tokens.
-
-TRANSACTION:
-- Amount: ${transaction['amount']:.2f}
-- Merchant: {transaction['merchant']} ({transaction['merchant_category']})
-- User: {transaction.get('user_id', 'Unknown')} (account age: {account_age} days)
-- Time: {transaction['timestamp']}
-
-RISK ANALYSIS:
-- ML Anomaly Score: {model_anomaly:.2f}/1.0 (weight: 40%)
-- Amount Ratio: {amount_ratio_raw:.2f}x avg (weight: 30%)
-- User Trust Score: {user_trust:.2f}/1.0 (weight: 20%)
-- Velocity Score: {velocity:.2f}/1.0 (weight: 10%)
-
-DECISION: {decision}
-
-Explain why this decision was made. Focus on the top 2 risk factors. Be concise and actionable."""
-
         # Call Groq API
-        print(f"Calling Groq API with model: llama-3.3-70b-versatile")
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",  # Best speed/quality balance
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a concise financial risk analyst. Respond in <100 tokens."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            max_tokens=150,  # Hard limit to prevent verbose responses
-            temperature=0.3,  # Low temp = more deterministic/factual
-            timeout=10  # Fail fast if Groq is slow
-        )
+        logger.debug("Calling Groq API with model: %s", GROQ_MODEL)
+        response = _client.chat.completions.create(**_completion_kwargs(prompt))
         
         explanation = response.choices[0].message.content.strip()
         token_count = len(explanation.split())
         
-        print(f"✅ LLM explanation generated ({token_count} tokens)")
-        print(f"Explanation preview: {explanation[:100]}...")
-        print(f"=== GROQ LLM EXPLANATION SUCCESS ===")
+        logger.debug("LLM explanation generated (%d tokens)", token_count)
         
+        _cache_put(cache_key, explanation, EXPLANATION_TTL_SECONDS)
         return explanation
         
     except Exception as e:
-        print(f"❌ GROQ LLM ERROR: {str(e)}")
-        print(f"=== GROQ LLM EXPLANATION FAILED ===")
+        logger.warning("Groq LLM error: %s", e)
         
-        # Fallback explanation if LLM fails - FIXED to handle nested dict
-        try:
-            model_score = risk_components.get('model_anomaly', {}).get('value', 0)
-            amount_ratio = risk_components.get('amount_ratio', {}).get('raw_ratio', 1)
-            return f"Decision: {decision}. Primary risk factors: ML anomaly score ({model_score:.2f}) and amount ratio ({amount_ratio:.2f}x average)."
-        except:
-            # Ultimate fallback if even that fails
-            return f"Decision: {decision}. Unable to generate detailed explanation due to technical error."
\ No newline at end of file
+        # Fallback explanation if LLM fails (briefly cached so an outage doesn't hammer Groq)
+        explanation = _fallback_explanation(cache_key)
+        _cache_put(cache_key, explanation, FALLBACK_TTL_SECONDS)
+        return explanation
+
+
+def generate_explanation_stream(transaction: dict, risk_components: dict, decision: str):
+    """
+    Streaming variant of generate_explanation: yields explanation text chunks
+    as Groq produces them (stream=True), so the first words reach the client
+    long before the full completion.
+    
+    Cached and fallback explanations are yielded as a single chunk, so callers
+    handle every path the same way. A completed stream is cached like a
+    regular explanation; a stream that fails part-way is not cached.
+    """
+    cache_key = _explanation_fingerprint(transaction, risk_components, decision)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        logger.debug("LLM explanation served from cache")
+        yield cached
+        return
+    
+    parts = []
+    try:
+        if _client is None:
+            raise ValueError("Groq API key not found in environment")
+        
+        prompt = _build_prompt(cache_key)
+        stream = _client.chat.completions.create(**_completion_kwargs(prompt), stream=True)
+        
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield delta
+    
+    except Exception as e:
+        logger.warning("Groq LLM error: %s", e)
+        if not parts:
+            explanation = _fallback_explanation(cache_key)
+            _cache_put(cache_key, explanation, FALLBACK_TTL_SECONDS)
+            yield explanation
+        return
+    
+    _cache_put(cache_key, ''.join(parts).strip(), EXPLANATION_TTL_SECONDS)
+
+
+async def generate_explanation_async(transaction: dict, risk_components: dict, decision: str, client: AsyncGroq) -> str:
+    """
+    Async variant of generate_explanation using a shared AsyncGroq client,
+    so many explanations can be awaited together with asyncio.gather.
+    Results go into the explanation cache; on any LLM error the template
+    explanation is returned and negatively cached.
+    """
+    cache_key = _explanation_fingerprint(transaction, risk_components, decision)
+    try:
+        prompt = _build_prompt(cache_key)
+        response = await client.chat.completions.create(**_completion_kwargs(prompt))
+        explanation = response.choices[0].message.content.strip()
+        _cache_put(cache_key, explanation, EXPLANATION_TTL_SECONDS)
+        return explanation
+    except Exception as e:
+        logger.warning("Groq LLM error: %s", e)
+        explanation = _fallback_explanation(cache_key)
+        _cache_put(cache_key, explanation, FALLBACK_TTL_SECONDS)
+        return explanation
+
+
+async def _generate_explanations_async(items: list) -> list:
+    """Run all explanation requests concurrently over one pooled AsyncGroq client"""
+    http_client = httpx.AsyncClient(limits=GROQ_HTTP_LIMITS)
+    async with AsyncGroq(api_key=Config.groq_api_key(), http_client=http_client) as client:
+        return await asyncio.gather(*[
+            generate_explanation_async(item['transaction'], item['risk_components'], item['decision'], client)
+            for item in items
+        ])
+
+
+def generate_explanations(items: list) -> list:
+    """
+    Generate explanations for a batch of decisions, overlapping the LLM calls.
+    
+    The AsyncGroq client lives for the duration of one batch: an async HTTP
+    client is bound to the event loop that created it, and each batch runs
+    in its own loop via asyncio.run.
+    
+    Args:
+        items: List of dicts with transaction, risk_components and decision keys
+    
+    Returns:
+        List of explanations, in the same order as items
+    """
+    if _client is None:
+        logger.warning("GROQ_API_KEY not configured - using template explanations")
+        return [
+            _fallback_explanation(_explanation_fingerprint(item['transaction'], item['risk_components'], item['decision']))
+            for item in items
+        ]
+    
+    # Serve cached explanations, only send misses to Groq
+    keys = [_explanation_fingerprint(item['transaction'], item['risk_components'], item['decision']) for item in items]
+    explanations = [_cache_get(key) for key in keys]
+    misses = [i for i, explanation in enumerate(explanations) if explanation is None]
+    
+    if misses:
+        generated = asyncio.run(_generate_explanations_async([items[i] for i in misses]))
+        for i, explanation in zip(misses, generated):
+            explanations[i] = explanation
+    
+    return explanations
+
+# Background explanations. Results are delivered through on_complete (e.g. stored on
+# the audit row, which every worker can read) - nothing is kept in process memory
+EXPLANATION_WORKERS = int(os.getenv('EXPLANATION_WORKERS', '8'))
+_explanation_executor = ThreadPoolExecutor(max_workers=EXPLANATION_WORKERS, thread_name_prefix='explain')
+
+
+def submit_explanation(transaction: dict, risk_components: dict, decision: str, on_complete=None) -> Future:
+    """
+    Generate an explanation off the request path.
+    
+    Args:
+        transaction, risk_components, decision: As for generate_explanation
+        on_complete: Optional callback(explanation), run in the worker thread
+            (e.g. to store the explanation on the audit log)
+    
+    Returns:
+        Future resolving to the explanation (only valid in this process)
+    """
+    def job():
+        explanation = generate_explanation(transaction, risk_components, decision)
+        if on_complete is not None:
+            try:
+                on_complete(explanation)
+            except Exception:
+                logger.exception("Explanation callback failed")
+        return explanation
+    
+    return _explanation_executor.submit(job)
@@ -1,79 +1,166 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import String, case, cast, func, insert, select
 from datetime import datetime, timedelta
-from database import SessionLocal, get_user_profile, get_all_profiles, Transaction, AuditLog
-from data_generator import generate_transaction
-from risk_ml import RiskMLService, generate_explanation
-from audit import log_decision, get_audit_logs
-import traceback
+from database import Session, get_user_profile, get_all_profiles, Transaction, AuditLog
+from data_generator import generate_transaction, generate_batch_transactions
+from risk_ml import (
+    RiskMLService, parse_timestamp, generate_explanation, generate_explanation_stream, generate_explanations,
+    submit_explanation
+)
+from audit import log_decision, get_audit_logs, flush_audit_log
+from schemas import score_transaction_decoder, calculate_risk_decoder
+import functools
+import logging
+import msgspec
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for demo-mode bulk generation in one request
+MAX_GENERATE_COUNT = 1000
+
+# Velocity window for /calculate-risk
+VELOCITY_WINDOW = timedelta(hours=1)
+
+# /transactions limits above this are streamed row by row instead of built in memory
+TRANSACTIONS_STREAM_THRESHOLD = 500
+TRANSACTIONS_STREAM_BATCH_SIZE = 500
+
+# /calculate-risk component names and their weights, in the same order
+RISK_COMPONENT_NAMES = ('ml_anomaly', 'amount_ratio', 'user_trust', 'velocity')
+RISK_WEIGHT_VALUES = (0.4, 0.3, 0.2, 0.1)
 
 api = Blueprint('api', __name__)
 risk_service = RiskMLService()
-USER_PROFILES = get_all_profiles()
+_UNKNOWN_USER = {'name': 'Unknown', 'avg_transaction': 100}
+
+# Profiles are static and have no table, so /transactions "joins" them in SQL with
+# CASE expressions over user_id instead of correlating rows in Python
+_USER_NAME = case(
+    {u['user_id']: u['name'] for u in get_all_profiles()},
+    value=Transaction.user_id,
+    else_=_UNKNOWN_USER['name']
+)
+_USER_AVG_TRANSACTION = case(
+    {u['user_id']: float(u['avg_transaction']) for u in get_all_profiles()},
+    value=Transaction.user_id,
+    else_=float(_UNKNOWN_USER['avg_transaction'])
+)
+
+# Columns returned by /transactions (plain rows, no ORM instances), already typed
+# for the response: the id comes back as a string and the derived fields are computed
+# by the database
+TRANSACTION_LIST_COLUMNS = (
+    cast(Transaction.transaction_id, String).label('transaction_id'),
+    Transaction.user_id,
+    Transaction.amount,
+    Transaction.merchant,
+    Transaction.merchant_category,
+    Transaction.location,
+    Transaction.timestamp,
+    Transaction.is_anomaly,
+    _USER_NAME.label('user_name'),
+    Transaction.is_anomaly.label('is_anomaly_label'),  # For frontend badge
+    (Transaction.amount / _USER_AVG_TRANSACTION).label('amount_ratio'),
+)
+
+# /health body around the timestamp, prebuilt so probes skip JSON serialization
+_HEALTH_PREFIX = b'{"status":"ok","timestamp":"'
+_HEALTH_SUFFIX = b'"}'
 
 @api.route('/health', methods=['GET'])
 def health():
-    return jsonify({
-        'status': 'ok',
-        'timestamp': datetime.now().isoformat()
-    })
+    # A fresh Response per call: after_request hooks (CORS) mutate its headers
+    body = _HEALTH_PREFIX + datetime.now().isoformat().encode() + _HEALTH_SUFFIX
+    return Response(body, mimetype='application/json')
+
+@functools.lru_cache(maxsize=1)
+def _users_body():
+    """
+    Serialized /users payload, built once per process. Profiles are static;
+    call _users_body.cache_clear() if an endpoint ever modifies them.
+    """
+    return orjson.dumps({'users': get_all_profiles()})
 
 @api.route('/users', methods=['GET'])
 def get_users():
     try:
-        profiles = get_all_profiles()
-        # Convert dict to list if needed
-        if isinstance(profiles, dict):
-            profiles_list = list(profiles.values())
-        else:
-            profiles_list = profiles
-        return jsonify({'users': profiles_list})
+        return Response(_users_body(), mimetype='application/json')
     except Exception as e:
-        print("ERROR in /users:")
-        traceback.print_exc()
+        logger.exception("Error in /users")
         return jsonify({'error': str(e)}), 500
 
+def _create_transactions_bulk(db, user_profile, is_anomaly, count):
+    """Generate and insert count transactions with one executemany INSERT ... RETURNING"""
+    transactions = generate_batch_transactions(user_profile, count, is_anomaly)
+    rows = [{
+        **transaction_data,
+        'timestamp': parse_timestamp(transaction_data['timestamp']),
+        'is_anomaly': is_anomaly
+    } for transaction_data in transactions]
+    
+    ids = db.scalars(
+        insert(Transaction).returning(Transaction.transaction_id, sort_by_parameter_order=True),
+        rows
+    ).all()
+    db.commit()
+    
+    for transaction_data, transaction_id in zip(transactions, ids):
+        transaction_data['transaction_id'] = transaction_id
+        transaction_data['is_anomaly'] = is_anomaly
+    return transactions
+
 @api.route('/generate-transaction', methods=['POST'])
 def create_transaction():
-    db = SessionLocal()
+    """
+    Generate and store a transaction for a user.
+    Body: {"user_id": ..., "is_anomaly": false, "count": 1}
+    With count > 1 (demo mode, max MAX_GENERATE_COUNT) the transactions are bulk
+    inserted and returned as {"transactions": [...], "count": n}.
+    """
+    db = Session()
     try:
-        print("=== GENERATE TRANSACTION START ===")
         data = request.get_json()
-        print(f"Request data: {data}")
+        logger.debug("Generate transaction request: %s", data)
         
         user_id = data.get('user_id')
         is_anomaly = data.get('is_anomaly', False)
+        count = data.get('count', 1)
         
         if not user_id:
             return jsonify({'error': 'user_id is required'}), 400
+        if not isinstance(count, int) or not 1 <= count <= MAX_GENERATE_COUNT:
+            return jsonify({'error': f'count must be an integer between 1 and {MAX_GENERATE_COUNT}'}), 400
         
-        print(f"Getting user profile for: {user_id}")
         user_profile = get_user_profile(user_id)
         if not user_profile:
             return jsonify({'error': 'User not found'}), 404
         
-        print(f"User profile: {user_profile}")
+        if count > 1:
+            transactions = _create_transactions_bulk(db, user_profile, is_anomaly, count)
+            logger.debug("Bulk inserted %d transactions", len(transactions))
+            return jsonify({'transactions': transactions, 'count': len(transactions)})
         
         # Generate transaction
-        print("Generating transaction...")
         transaction_data = generate_transaction(user_profile, is_anomaly)
-        print(f"Generated transaction: {transaction_data}")
+        logger.debug("Generated transaction: %s", transaction_data)
         
         # Save to database
-        print("Saving to database...")
         transaction = Transaction(
             user_id=transaction_data['user_id'],
             amount=transaction_data['amount'],
             merchant=transaction_data['merchant'],
             merchant_category=transaction_data['merchant_category'],
             location=transaction_data['location'],
-            timestamp=datetime.fromisoformat(transaction_data['timestamp'].replace('Z', '+00:00')),
+            timestamp=parse_timestamp(transaction_data['timestamp']),
             is_anomaly=is_anomaly
         )
         
+        # expire_on_commit=False: the new transaction_id (populated by the INSERT)
+        # stays readable after commit, so no refresh SELECT is needed
         db.add(transaction)
         db.commit()
-        db.refresh(transaction)
-        print(f"Saved transaction with ID: {transaction.transaction_id}")
+        logger.debug("Saved transaction with ID: %s", transaction.transaction_id)
         
         # Convert to dict for response
         result = {
@@ -83,136 +170,148 @@ def create_transaction():
             'merchant': transaction.merchant,
             'merchant_category': transaction.merchant_category,
             'location': transaction.location,
-            'timestamp': transaction.timestamp.isoformat() + 'Z',
+            'timestamp': transaction_data['timestamp'],  # already ISO-formatted - no re-serialization
             'is_anomaly': transaction.is_anomaly
         }
         
-        print("\n\t=== GENERATE TRANSACTION SUCCESS ===")
         return jsonify(result)
     except Exception as e:
-        print("=== GENERATE TRANSACTION ERROR ===")
-        print(f"Error: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in /generate-transaction")
         db.rollback()
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
 
 @api.route('/transactions', methods=['GET'])
 def get_transactions():
-    db = SessionLocal()
+    db = Session()
     try:
-        print("=== GET TRANSACTIONS START ===")
         user_id = request.args.get('user_id')
         is_anomaly = request.args.get('is_anomaly')
         limit = int(request.args.get('limit', 50))
         
-        print(f"Query params - user_id: {user_id}, is_anomaly: {is_anomaly}, limit: {limit}")
+        logger.debug("Query params - user_id: %s, is_anomaly: %s, limit: %s", user_id, is_anomaly, limit)
         
-        query = db.query(Transaction)
+        # Core select of just the needed columns - skips ORM identity map/instrumentation
+        stmt = select(*TRANSACTION_LIST_COLUMNS)
         
         if user_id:
-            query = query.filter(Transaction.user_id == user_id)
+            stmt = stmt.where(Transaction.user_id == user_id)
         if is_anomaly is not None:
             is_anomaly_bool = is_anomaly.lower() == 'true'
-            query = query.filter(Transaction.is_anomaly == is_anomaly_bool)
-        
-        transactions = query.order_by(Transaction.timestamp.desc()).limit(limit).all()
-        print(f"Found {len(transactions)} transactions")
-        
-        result = [{
-        'transaction_id': str(t.transaction_id),  # Convert to string
-        'user_id': t.user_id,
-        'user_name': next((u['name'] for u in USER_PROFILES if u['user_id'] == t.user_id), 'Unknown'),  # Add user name
-        'amount': float(t.amount),
-        'merchant': t.merchant,
-        'merchant_category': t.merchant_category,
-        'location': t.location,
-        'timestamp': t.timestamp.isoformat() + 'Z',
-        'is_anomaly': t.is_anomaly,
-        'is_anomaly_label': t.is_anomaly,  # For frontend badge
-        'amount_ratio': float(t.amount) / next((u['avg_transaction'] for u in USER_PROFILES if u['user_id'] == t.user_id), 100)  # Calculate ratio
-    } for t in transactions]
-        
-        print("=== GET TRANSACTIONS SUCCESS ===")
+            stmt = stmt.where(Transaction.is_anomaly == is_anomaly_bool)
+        
+        stmt = stmt.order_by(Transaction.timestamp.desc()).limit(limit)
+        
+        if limit > TRANSACTIONS_STREAM_THRESHOLD:
+            return _stream_transactions(db, stmt)
+        
+        rows = db.execute(stmt).mappings().all()
+        logger.debug("Found %d transactions", len(rows))
+        
+        # Rows already hold every response field (timestamp is serialized by orjson
+        # as ISO-8601 with 'Z')
+        result = [dict(row) for row in rows]
+        
         return jsonify({
             'transactions': result,
             'count': len(result)
         })
     except Exception as e:
-        print("=== GET TRANSACTIONS ERROR ===")
-        print(f"Error: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in /transactions")
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
+
+def _stream_transactions(db, stmt):
+    """
+    Stream the /transactions body as it is read from the cursor.
+    
+    Same JSON shape as the buffered response ({"transactions": [...], "count": n}),
+    with count written last; rows are fetched TRANSACTIONS_STREAM_BATCH_SIZE at a time.
+    """
+    dumpb = current_app.json.dumpb
+    
+    def body():
+        result = db.execute(stmt.execution_options(yield_per=TRANSACTIONS_STREAM_BATCH_SIZE))
+        count = 0
+        yield b'{"transactions":['
+        for row in result.mappings():
+            if count:
+                yield b',' + dumpb(dict(row))
+            else:
+                yield dumpb(dict(row))
+            count += 1
+        yield b'],"count":' + str(count).encode() + b'}'
+    
+    return Response(stream_with_context(body()), mimetype='application/json')
 
 @api.route('/transactions/stats', methods=['GET'])
 def get_stats():
-    db = SessionLocal()
+    db = Session()
     try:
-        print("=== GET STATS START ===")
-        total = db.query(Transaction).count()
-        normal = db.query(Transaction).filter(Transaction.is_anomaly == False).count()
-        anomalous = db.query(Transaction).filter(Transaction.is_anomaly == True).count()
+        # One grouped index scan; totals and the per-user breakdown are summed in Python
+        rows = db.execute(
+            select(Transaction.is_anomaly, Transaction.user_id, func.count())
+            .group_by(Transaction.is_anomaly, Transaction.user_id)
+        ).all()
+        
+        normal = anomalous = 0
+        by_user = {}
+        for is_anomaly, user_id, count in rows:
+            user_stats = by_user.setdefault(user_id, {'total': 0, 'normal': 0, 'anomalous': 0})
+            user_stats['total'] += count
+            if is_anomaly:
+                user_stats['anomalous'] += count
+                anomalous += count
+            else:
+                user_stats['normal'] += count
+                normal += count
+        total = normal + anomalous
         
-        print(f"Stats - total: {total}, normal: {normal}, anomalous: {anomalous}")
-        print("=== GET STATS SUCCESS ===")
+        logger.debug("Stats - total: %s, normal: %s, anomalous: %s", total, normal, anomalous)
         
         return jsonify({
             'total': total,
             'normal': normal,
-            'anomalous': anomalous
+            'anomalous': anomalous,
+            'by_user': by_user
         })
     except Exception as e:
-        print("=== GET STATS ERROR ===")
-        print(f"Error: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in /transactions/stats")
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
 
 @api.route('/score-transaction', methods=['POST'])
 def score_transaction():
     try:
-        print("=== SCORE TRANSACTION START ===")
-        data = request.get_json()
-        print(f"\n\tRequest data: {data}")
-        transaction = data.get('transaction')
-        user_profile = data.get('user_profile')
+        # Decode and validate the body in one pass
+        req = score_transaction_decoder.decode(request.get_data(cache=False))
+    except msgspec.DecodeError as e:
+        return jsonify({'error': f'Invalid request body: {e}'}), 400
+    
+    try:
+        transaction = req.transaction
+        user_profile = req.user_profile
+        
+        # Parse the timestamp once here; the service layer reuses the datetime
+        transaction['_ts'] = parse_timestamp(transaction['timestamp'])
         
-        if not transaction or not user_profile:
-            return jsonify({'error': 'transaction and user_profile are required'}), 400
-        print("====="*10,181)
         result = risk_service.score_transaction(transaction, user_profile)
-        print(f"\n\tScoring result: {result}")
-        print("=== SCORE TRANSACTION SUCCESS ===")
+        logger.debug("Scoring result: %s", result)
         return jsonify(result)
     except Exception as e:
-        print("=== SCORE TRANSACTION ERROR ===")
-        print(f"Error: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in /score-transaction")
         return jsonify({'error': str(e)}), 500
 
-@api.route('/calculate-risk', methods=['POST'])
 @api.route('/calculate-risk', methods=['POST'])
 def calculate_risk():
     """Calculate comprehensive risk score with business rules + ML"""
-    print("\n=== CALCULATE RISK START ===")
+    try:
+        # Decode and validate the body in one pass
+        req = calculate_risk_decoder.decode(request.get_data(cache=False))
+    except msgspec.DecodeError as e:
+        return jsonify({'error': f'Invalid request body: {e}'}), 400
     
     try:
-        data = request.json
-        print(f"Received data: {data}")
-        
-        # Extract transaction and profile data
-        transaction = data.get('transaction')
-        user_profile = data.get('user_profile')
-        ml_score = data.get('ml_score')
-        
-        # Validation
-        if not transaction or not user_profile or ml_score is None:
-            print("❌ Missing required fields")
-            return jsonify({'error': 'Missing required fields: transaction, user_profile, or ml_score'}), 400
+        transaction = req.transaction
+        user_profile = req.user_profile
+        ml_score = req.ml_score
         
         # Extract specific fields
         transaction_id = transaction.get('transaction_id')
@@ -220,95 +319,87 @@ def calculate_risk():
         amount = transaction.get('amount')
         
         if not all([transaction_id, user_id, amount]):
-            print("❌ Missing transaction fields")
             return jsonify({'error': 'Missing transaction_id, user_id, or amount'}), 400
         
-        print(f"User profile: {user_profile['user_id']}, trust: {user_profile['trust_score']}")
-        print(f"Transaction ID: {transaction_id}, Amount: ${amount}, ML Score: {ml_score:.3f}")
+        logger.debug("Transaction ID: %s, user: %s, amount: %s, ML score: %.3f",
+                     transaction_id, user_id, amount, ml_score)
+        
+        # Calculate velocity (user's transactions in the last hour). Count-only range
+        # query answered from ix_txn_user_time (user_id, timestamp) - no rows fetched
+        now = datetime.now()
+        recent_txns = Session().execute(
+            select(func.count())
+            .select_from(Transaction)
+            .where(
+                Transaction.user_id == user_id,
+                Transaction.timestamp >= now - VELOCITY_WINDOW,
+                Transaction.timestamp <= now
+            )
+        ).scalar()
+        velocity_score = min(recent_txns / 10.0, 1.0)  # Normalize: 10+ txns = max risk
+        
+        # Calculate amount ratio
+        avg_transaction = user_profile['avg_transaction']
+        amount_ratio = amount / avg_transaction
+        amount_ratio_score = min(amount_ratio / 3.0, 1.0)  # 3x avg = max risk
+        
+        # Calculate trust score (inverse of account age risk)
+        trust_score = user_profile['trust_score']
+        trust_risk = 1.0 - trust_score  # Higher trust = lower risk
+        
+        # === WEIGHTED RISK CALCULATION ===
+        # Flat tuples against the fixed weight tuple; the nested dict is built once for the response
+        values = (ml_score, amount_ratio_score, trust_risk, velocity_score)
+        contributions = [value * weight for value, weight in zip(values, RISK_WEIGHT_VALUES)]
+        final_risk = sum(contributions)
+        
+        risk_components = {
+            name: {'value': value, 'weight': weight, 'contribution': contribution}
+            for name, value, weight, contribution in zip(RISK_COMPONENT_NAMES, values, RISK_WEIGHT_VALUES, contributions)
+        }
         
-        # Get database session
-        db = SessionLocal()
+        # === DECISION LOGIC ===
+        if final_risk > 0.7:
+            decision = "DECLINE"
+        elif final_risk > 0.4:
+            decision = "MANUAL REVIEW"
+        else:
+            decision = "APPROVE"
         
-        try:
-            # Calculate velocity (transactions in last hour)
-            # For demo, use simplified logic - in production, query DB for time window
-            recent_txns = db.query(Transaction).filter(Transaction.user_id == user_id).count()
-            velocity_score = min(recent_txns / 10.0, 1.0)  # Normalize: 10+ txns = max risk
-            
-            # Calculate amount ratio
-            avg_transaction = user_profile['avg_transaction']
-            amount_ratio = amount / avg_transaction
-            amount_ratio_score = min(amount_ratio / 3.0, 1.0)  # 3x avg = max risk
-            
-            # Calculate trust score (inverse of account age risk)
-            trust_score = user_profile['trust_score']
-            trust_risk = 1.0 - trust_score  # Higher trust = lower risk
-            
-            # === WEIGHTED RISK CALCULATION ===
-            risk_components = {
-                'ml_anomaly': {
-                    'value': ml_score,
-                    'weight': 0.4,
-                    'contribution': ml_score * 0.4
-                },
-                'amount_ratio': {
-                    'value': amount_ratio_score,
-                    'weight': 0.3,
-                    'contribution': amount_ratio_score * 0.3
-                },
-                'user_trust': {
-                    'value': trust_risk,
-                    'weight': 0.2,
-                    'contribution': trust_risk * 0.2
-                },
-                'velocity': {
-                    'value': velocity_score,
-                    'weight': 0.1,
-                    'contribution': velocity_score * 0.1
-                }
-            }
-            
-            # Calculate final weighted score
-            final_risk = sum(comp['contribution'] for comp in risk_components.values())
-            
-            # === DECISION LOGIC ===
-            if final_risk > 0.7:
-                decision = "DECLINE"
-            elif final_risk > 0.4:
-                decision = "MANUAL REVIEW"
-            else:
-                decision = "APPROVE"
-            
-            print(f"Final risk: {final_risk:.3f} → {decision}")
-            
-            # === LOG TO AUDIT TRAIL ===
-            print("=== CALLING AUDIT LOGGER ===")
-            audit_entry = log_decision(
-                transaction_id=transaction_id,
-                user_id=user_id,
-                risk_score=final_risk,
-                decision=decision,
-                risk_components=risk_components,
-                explanation=None  # Will be added by /explain-decision endpoint
-            )
-            
-            response = {
-                'risk_score': round(final_risk, 3),
-                'decision': decision,
-                'components': risk_components,
-                'audit_id': audit_entry.id  # Return audit log ID for reference
-            }
-            
-            print("=== CALCULATE RISK SUCCESS ===")
-            return jsonify(response)
-            
-        finally:
-            db.close()
+        logger.debug("Final risk: %.3f -> %s", final_risk, decision)
+        
+        # === LOG TO AUDIT TRAIL ===
+        audit_id = log_decision(
+            transaction_id=transaction_id,
+            user_id=user_id,
+            risk_score=final_risk,
+            decision=decision,
+            risk_components=risk_components,
+            explanation=None  # Will be added by /explain-decision endpoint
+        )
+        
+        # === EXPLAIN IN THE BACKGROUND ===
+        # The LLM call doesn't block this response. The result is written to this
+        # decision's audit row, so GET /explanation/<audit_id> works from any worker
+        submit_explanation(
+            transaction,
+            risk_components,
+            decision,
+            on_complete=lambda explanation: _store_background_explanation(transaction_id, explanation, audit_id)
+        )
+        
+        response = {
+            'risk_score': round(final_risk, 3),
+            'decision': decision,
+            'components': risk_components,
+            'audit_id': audit_id,  # Client-assigned audit_uuid (row is committed in the background)
+            'explanation_id': audit_id  # Poll GET /explanation/<explanation_id>
+        }
+        
+        return jsonify(response)
         
     except Exception as e:
-        print(f"❌ ERROR: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in /calculate-risk")
         return jsonify({'error': str(e)}), 500
     
 @api.route('/audit-log', methods=['GET'])
@@ -319,8 +410,6 @@ def get_audit_log():
         - limit: Max entries to return (default 10, max 100)
         - user_id: Filter by specific user (optional)
     """
-    print("\n=== GET AUDIT LOG START ===")
-    
     try:
         # Parse query parameters
         limit = request.args.get('limit', default=10, type=int)
@@ -329,30 +418,88 @@ def get_audit_log():
         # Enforce max limit
         limit = min(limit, 100)
         
-        print(f"Fetching audit logs: limit={limit}, user_id={user_id}")
-        
         # Fetch logs using audit service
         logs = get_audit_logs(limit=limit, user_id=user_id)
         
-        print(f"✅ Returning {len(logs)} audit entries")
-        print("=== GET AUDIT LOG SUCCESS ===")
-        
         return jsonify({
             'count': len(logs),
             'logs': logs
         })
         
     except Exception as e:
-        print(f"❌ ERROR: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in /audit-log")
         return jsonify({'error': str(e)}), 500
         
+def attach_explanation_to_audit(transaction_id, explanation, audit_uuid=None):
+    """
+    Store an explanation on an audit entry: the one with audit_uuid if given,
+    otherwise the most recent entry for the transaction
+    """
+    if not transaction_id and not audit_uuid:
+        return
+    
+    # The decision's audit row may still be queued in the audit writer
+    flush_audit_log()
+    
+    db = Session()
+    if audit_uuid:
+        stmt = select(AuditLog).where(AuditLog.audit_uuid == audit_uuid)
+    else:
+        # Most recent audit entry for this transaction (index range scan on ix_audit_txn_time)
+        stmt = (
+            select(AuditLog)
+            .where(AuditLog.transaction_id == transaction_id)
+            .order_by(AuditLog.timestamp.desc())
+            .limit(1)
+        )
+    audit_entry = db.execute(stmt).scalar_one_or_none()
+    
+    if audit_entry:
+        audit_entry.explanation = explanation
+        db.commit()
+        logger.debug("Audit log %s updated with explanation", audit_entry.id)
+    else:
+        logger.warning("No audit entry found for transaction %s", transaction_id)
+
+def _store_background_explanation(transaction_id, explanation, audit_uuid):
+    """Save a background-generated explanation; the worker thread owns its own scoped session"""
+    try:
+        attach_explanation_to_audit(transaction_id, explanation, audit_uuid)
+    finally:
+        Session.remove()
+
+@api.route('/explanation/<explanation_id>', methods=['GET'])
+def get_explanation(explanation_id):
+    """
+    Poll for an explanation started by /calculate-risk (explanation_id is the decision's audit_id).
+    Served from the audit row, so any worker can answer. Returns 200 with the explanation
+    when it has been stored, 202 while it is still being generated, 404 for unknown ids.
+    """
+    try:
+        # The decision row may still be queued in this worker's audit writer
+        flush_audit_log()
+        row = Session().execute(
+            select(AuditLog.explanation, AuditLog.timestamp)
+            .where(AuditLog.audit_uuid == explanation_id)
+        ).first()
+        
+        if row is None:
+            return jsonify({'error': 'Unknown explanation_id'}), 404
+        if row.explanation is None:
+            return jsonify({'explanation_id': explanation_id, 'status': 'pending'}), 202
+        
+        return jsonify({
+            'explanation_id': explanation_id,
+            'explanation': row.explanation,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        logger.exception("Error in /explanation")
+        return jsonify({'error': str(e)}), 500
+
 @api.route('/explain-decision', methods=['POST'])
 def explain_decision():
     """Generate LLM explanation for risk decision"""
-    print("\n=== EXPLAIN DECISION START ===")
-    
     try:
         data = request.json
         transaction = data.get('transaction')
@@ -362,9 +509,6 @@ def explain_decision():
         if not all([transaction, risk_components, decision]):
             return jsonify({'error': 'Missing required fields'}), 400
         
-        # Import the standalone function (not from class)
-        from risk_ml import generate_explanation
-        
         # Call the standalone function directly
         explanation = generate_explanation(
             transaction=transaction,
@@ -372,38 +516,91 @@ def explain_decision():
             decision=decision
         )
         
-        print(f"✅ Generated explanation: {explanation[:100]}...")
-        
         # === UPDATE AUDIT LOG WITH EXPLANATION ===
-        transaction_id = transaction.get('transaction_id')
-        if transaction_id:
-            print(f"=== UPDATING AUDIT LOG {transaction_id} WITH EXPLANATION ===")
-            db = SessionLocal()
-            try:
-                # Find the most recent audit entry for this transaction
-                audit_entry = db.query(AuditLog).filter(
-                    AuditLog.transaction_id == transaction_id
-                ).order_by(AuditLog.timestamp.desc()).first()
-                
-                if audit_entry:
-                    audit_entry.explanation = explanation
-                    db.commit()
-                    print(f"✅ Audit log {audit_entry.id} updated with explanation")
-                else:
-                    print(f"⚠️ No audit entry found for transaction {transaction_id}")
-            finally:
-                db.close()
+        attach_explanation_to_audit(transaction.get('transaction_id'), explanation)
         
         response = {
             'explanation': explanation,
             'timestamp': datetime.utcnow().isoformat()
         }
         
-        print("=== EXPLAIN DECISION SUCCESS ===")
         return jsonify(response)
         
     except Exception as e:
-        print(f"❌ ERROR: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in /explain-decision")
+        return jsonify({'error': str(e)}), 500
+
+def _sse(data, event=None):
+    """Format one Server-Sent Events message"""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {orjson.dumps(data).decode()}\n\n"
+
+@api.route('/explain-decision/stream', methods=['POST'])
+def explain_decision_stream():
+    """
+    Stream the LLM explanation for a risk decision as Server-Sent Events.
+    Events: "decision" (sent immediately), unnamed {"token": ...} chunks as Groq
+    produces them, then "done" with the full explanation (also saved to the audit log).
+    Same body as /explain-decision.
+    """
+    data = request.json or {}
+    transaction = data.get('transaction')
+    risk_components = data.get('risk_components')
+    decision = data.get('decision')
+    
+    if not all([transaction, risk_components, decision]):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    def events():
+        yield _sse({'transaction_id': transaction.get('transaction_id'), 'decision': decision}, event='decision')
+        
+        parts = []
+        try:
+            for token in generate_explanation_stream(transaction, risk_components, decision):
+                parts.append(token)
+                yield _sse({'token': token})
+            
+            explanation = ''.join(parts).strip()
+            attach_explanation_to_audit(transaction.get('transaction_id'), explanation)
+            yield _sse({'explanation': explanation, 'timestamp': datetime.utcnow().isoformat()}, event='done')
+        
+        except Exception as e:
+            logger.exception("Error in /explain-decision/stream")
+            yield _sse({'error': str(e)}, event='error')
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@api.route('/explain-decisions', methods=['POST'])
+def explain_decisions():
+    """
+    Generate LLM explanations for a batch of risk decisions.
+    The Groq calls run concurrently, so the batch takes roughly as long as the slowest one.
+    Body: {"items": [{"transaction": ..., "risk_components": ..., "decision": ...}, ...]}
+    """
+    try:
+        items = (request.json or {}).get('items')
+        
+        if not items or not all(
+            item.get('transaction') and item.get('risk_components') and item.get('decision')
+            for item in items
+        ):
+            return jsonify({'error': 'items must be a non-empty list of transaction/risk_components/decision'}), 400
+        
+        explanations = generate_explanations(items)
+        
+        for item, explanation in zip(items, explanations):
+            attach_explanation_to_audit(item['transaction'].get('transaction_id'), explanation)
+        
+        logger.debug("Generated %d explanations", len(explanations))
+        return jsonify({
+            'explanations': explanations,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+        
+    except Exception as e:
+        logger.exception("Error in /explain-decisions")
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+Request body schemas for the scoring endpoints, decoded and validated by msgspec in one pass.
+"""
+
+from typing import Annotated
+
+import msgspec
+
+# Required objects must also be non-empty
+NonEmptyDict = Annotated[dict, msgspec.Meta(min_length=1)]
+
+
+class ScoreTransactionRequest(msgspec.Struct):
+    """POST /score-transaction body"""
+    transaction: NonEmptyDict
+    user_profile: NonEmptyDict
+
+
+class RiskTransactionKeys(msgspec.Struct):
+    """Fields of the /calculate-risk transaction that are stored on the audit row"""
+    transaction_id: int
+    user_id: str
+
+
+class CalculateRiskRequest(msgspec.Struct):
+    """POST /calculate-risk body"""
+    transaction: NonEmptyDict
+    user_profile: NonEmptyDict
+    ml_score: float
+    
+    def __post_init__(self):
+        # transaction stays a dict for the service layer; validate the audited keys
+        # and write back the coerced values (e.g. "8" -> 8, as /transactions returns ids as strings)
+        try:
+            keys = msgspec.convert(self.transaction, RiskTransactionKeys, strict=False)
+        except msgspec.ValidationError as e:
+            raise ValueError(f"transaction: {e}") from None
+        self.transaction['transaction_id'] = keys.transaction_id
+        self.transaction['user_id'] = keys.user_id
+
+
+# Decoders are built once; decode() raises msgspec.DecodeError (or its subclass
+# msgspec.ValidationError) for malformed JSON, missing fields or wrong types
+score_transaction_decoder = msgspec.json.Decoder(ScoreTransactionRequest)
+calculate_risk_decoder = msgspec.json.Decoder(CalculateRiskRequest)
@@ -0,0 +1,16 @@
+"""
+WSGI entrypoint for gunicorn.
+
+gevent must patch the stdlib before anything else is imported so that
+sockets (including the httpx client used by the Groq SDK) and threading
+yield to other greenlets instead of blocking the worker.
+
+sqlite3 is NOT made cooperative: it is a C extension, so every query still
+blocks the whole worker (all of its greenlets) until it returns. Keep DB work
+short; concurrency across queries comes from running several workers.
+"""
+
+from gevent import monkey
+monkey.patch_all()
+
+from app import app  # noqa: E402
@@ -0,0 +1,80 @@
+"""
+Tests for RiskMLService.shap_explanations' LRU cache. Run from the repo root:
+
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server'))
+
+import risk_ml  # noqa: E402
+
+
+class StubExplainer:
+    """Returns each row's first four values as its SHAP values and records the batches"""
+    
+    def __init__(self):
+        self.batches = []
+    
+    def shap_values(self, rows, check_additivity=True):
+        self.batches.append(len(rows))
+        return rows[:, :4]
+
+
+def make_service():
+    service = risk_ml.RiskMLService.__new__(risk_ml.RiskMLService)
+    service.explainer = StubExplainer()
+    service._shap_cache = OrderedDict()
+    return service
+
+
+def key(n):
+    # (amount_ratio, hour, day, merchant_category, age_bucket)
+    return (float(n), 0.0, 0.0, 0.0, 1.0)
+
+
+class ShapCacheTest(unittest.TestCase):
+    
+    def setUp(self):
+        self._cache_size = risk_ml.SHAP_CACHE_SIZE
+        risk_ml.SHAP_CACHE_SIZE = 2
+    
+    def tearDown(self):
+        risk_ml.SHAP_CACHE_SIZE = self._cache_size
+    
+    def test_batch_larger_than_cache(self):
+        service = make_service()
+        keys = [key(1), key(2), key(3), key(1)]
+        
+        results = service.shap_explanations(keys)
+        
+        self.assertEqual([r['amount_ratio'] for r in results], [1.0, 2.0, 3.0, 1.0])
+        self.assertEqual(service.explainer.batches, [3])
+        self.assertEqual(len(service._shap_cache), 2)
+    
+    def test_hits_survive_eviction_by_misses(self):
+        service = make_service()
+        service.shap_explanations([key(1), key(2)])
+        
+        # Both cached keys are hits; the two misses evict them from a size-2 cache
+        results = service.shap_explanations([key(1), key(2), key(3), key(4)])
+        
+        self.assertEqual([r['amount_ratio'] for r in results], [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(service.explainer.batches, [2, 2])
+        self.assertEqual(list(service._shap_cache), [key(3), key(4)])
+    
+    def test_results_are_copies(self):
+        service = make_service()
+        service.shap_explanations([key(1)])[0]['amount_ratio'] = -1.0
+        
+        self.assertEqual(service.shap_explanations([key(1)])[0]['amount_ratio'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
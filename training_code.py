@@ -1,15 +1,25 @@
 """
 ML-based risk scoring and SHAP explanations
 """
-import pickle
+import joblib
 import numpy as np
 from sklearn.ensemble import IsolationForest
 from datetime import datetime
+from functools import lru_cache
 import os
 
+from server.compiled_model import load_compiled_predictor, predict_raw
+
+# Max number of distinct quantized feature tuples whose scores are memoized
+SCORE_CACHE_SIZE = 4096
+
+# "Typical" transaction each feature is reset to when measuring its contribution
+SHAP_BASELINE = np.array([[1.0, 14, 3, 0.3, 365]], dtype=np.float32)
+
 class RiskMLService:
     def __init__(self):
         self.model = None
+        self._predictor = None
         self.feature_names = [
             'amount_ratio',
             'hour',
@@ -18,14 +28,24 @@ class RiskMLService:
             'account_age_days'
         ]
         self.load_or_train_model()
+        
+        # Reusable float32 scratch buffers - sklearn's trees compare in float32,
+        # so this skips a float64 allocation + conversion on every score.
+        # Not shared across threads: each worker process owns one service.
+        n_features = len(self.feature_names)
+        self._feat_buf = np.empty((1, n_features), dtype=np.float32)
+        self._perturb_buf = np.empty((n_features, n_features), dtype=np.float32)
+        
+        # Per-instance memo of (raw_score, shap_features) keyed on the quantized
+        # feature tuple - repeated transaction shapes skip both model calls
+        self._score_quantized = lru_cache(maxsize=SCORE_CACHE_SIZE)(self._score_uncached)
     
     def load_or_train_model(self):
         """Load existing model or train a new one"""
         model_path = 'models/model.pkl'
         
         if os.path.exists(model_path):
-            with open(model_path, 'rb') as f:
-                self.model = pickle.load(f)
+            self.model = joblib.load(model_path, mmap_mode='r')
             print("Loaded existing Isolation Forest model")
         else:
             print("Training new Isolation Forest model...")
@@ -58,14 +78,22 @@ class RiskMLService:
                 np.random.uniform(1, 30, n_anomalies)
             ])
             
-            training_data = np.vstack([normal_data, anomaly_data])
+            training_data = np.vstack([normal_data, anomaly_data]).astype(np.float32)
             self.model.fit(training_data)
             
             # Save model
             os.makedirs('models', exist_ok=True)
-            with open(model_path, 'wb') as f:
-                pickle.dump(self.model, f)
+            # Uncompressed so arrays are stored as raw buffers that joblib.load can mmap
+            joblib.dump(self.model, model_path, compress=0)
             print(f"Model trained and saved to {model_path}")
+        
+        self._predictor = load_compiled_predictor(self.model, model_path)
+    
+    def anomaly_scores(self, feature_matrix):
+        """Raw anomaly scores (= -score_samples, higher = more anomalous) for each row"""
+        if self._predictor is not None:
+            return predict_raw(self._predictor, feature_matrix)
+        return -self.model.score_samples(feature_matrix)
     
     def extract_features(self, transaction):
         """Extract ML features from transaction dictionary"""
@@ -79,24 +107,29 @@ class RiskMLService:
             'account_age_days': transaction['account_age_days']
         }
         
-        feature_vector = np.array([
-            features[name] for name in self.feature_names
-        ]).reshape(1, -1)
+        # Fill the preallocated buffer in place (overwritten by the next call)
+        feature_vector = self._feat_buf
+        for i, name in enumerate(self.feature_names):
+            feature_vector[0, i] = features[name]
         
         return features, feature_vector
     
     def calculate_shap_approximation(self, features, feature_vector, anomaly_score):
-        """Simplified SHAP-like attribution"""
-        baseline = np.array([[1.0, 14, 3, 0.3, 365]])
-        baseline_score = -self.model.score_samples(baseline)[0]
+        """
+        Simplified SHAP-like attribution.
+        Each feature is swapped for its baseline value in turn; all perturbed
+        rows are scored in a single batched call.
+        """
+        n_features = len(self.feature_names)
+        perturbed_batch = self._perturb_buf
+        perturbed_batch[:] = feature_vector
+        perturbed_batch[np.arange(n_features), np.arange(n_features)] = SHAP_BASELINE[0]
+        perturbed_scores = self.anomaly_scores(perturbed_batch)
         
-        contributions = {}
-        for i, feature_name in enumerate(self.feature_names):
-            perturbed = feature_vector.copy()
-            perturbed[0, i] = baseline[0, i]
-            perturbed_score = -self.model.score_samples(perturbed)[0]
-            contribution = anomaly_score - perturbed_score
-            contributions[feature_name] = float(contribution)
+        contributions = {
+            feature_name: float(anomaly_score - perturbed_score)
+            for feature_name, perturbed_score in zip(self.feature_names, perturbed_scores)
+        }
         
         sorted_features = sorted(
             contributions.items(),
@@ -106,22 +139,34 @@ class RiskMLService:
         
         return dict(sorted_features)
     
+    def quantize_features(self, features):
+        """Round features into a hashable cache key (ratio to 0.1, risk to 0.01, whole days)"""
+        return (
+            round(features['amount_ratio'], 1),
+            features['hour'],
+            features['day_of_week'],
+            round(features['category_risk'], 2),
+            int(features['account_age_days'])
+        )
+    
+    def _score_uncached(self, key):
+        """Score a quantized feature tuple: raw anomaly score + SHAP-like attribution"""
+        feature_vector = self._feat_buf
+        feature_vector[0] = key
+        raw_score = self.anomaly_scores(feature_vector)[0]
+        shap_features = self.calculate_shap_approximation(None, feature_vector, raw_score)
+        return raw_score, shap_features
+    
     def score_transaction(self, transaction):
         """Score a transaction and return anomaly score with SHAP features"""
         try:
             features, feature_vector = self.extract_features(transaction)
-            raw_score = -self.model.score_samples(feature_vector)[0]
+            raw_score, shap_features = self._score_quantized(self.quantize_features(features))
             anomaly_score = min(max(raw_score, 0), 1)
             
-            shap_features = self.calculate_shap_approximation(
-                features, 
-                feature_vector, 
-                raw_score
-            )
-            
             return {
                 'anomaly_score': float(anomaly_score),
-                'shap_features': shap_features,
+                'shap_features': dict(shap_features),  # copy - cached dict is shared
                 'raw_features': features
             }
             